@@ -118,15 +118,58 @@ def initialize_providers(config=None):
         }
     }
 
+def _ollama_format_kwargs(response_format):
+    """
+    Ollama takes the JSON schema itself via format=..., or "json" for plain JSON mode
+    """
+    if not response_format:
+        return {}
+    if response_format.get("type") == "json_schema":
+        return {"format": response_format["json_schema"]["schema"]}
+    return {"format": "json"}
+
+# Error text a provider returns when it does not support the structured-output parameter
+_FORMAT_ERROR_HINTS = ("response_format", "json_schema", "json_object", "structured output", "format")
+
+def _rejects_response_format(error):
+    """
+    True only when the provider rejected the structured-output parameter itself
+    (400/422 mentioning it, or an SDK without the keyword) - not for network/auth errors
+    """
+    if isinstance(error, TypeError):
+        return "unexpected keyword argument" in str(error)
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    if status not in (400, 422):
+        return False
+    message = (str(error) + " " + str(getattr(response, "text", "") or "")).lower()
+    return any(hint in message for hint in _FORMAT_ERROR_HINTS)
+
+def _send_with_format(send, format_kwargs, provider_name):
+    """
+    send(**format_kwargs); if the provider rejects the structured-output parameter,
+    retry this provider once without it (the prompt still describes the expected JSON)
+    """
+    try:
+        return send(**format_kwargs)
+    except Exception as e:
+        if not format_kwargs or not _rejects_response_format(e):
+            raise
+        print(f"{provider_name} rejected structured output ({str(e)}). Retrying {provider_name} without it...")
+        return send()
+
 def call_api(
     prompt, image_contents=None,
     providers=None,
     ollama_only=False, ollama_model_text="gemma2:2b",
     max_tokens=10000,
-    huggingface_url="https://router.huggingface.co/nebius/v1/chat/completions"
+    huggingface_url="https://router.huggingface.co/nebius/v1/chat/completions",
+    response_format=None
 ):
     """
     Call API providers in priority order: Mistral -> DeepSeek -> OpenRouter -> Hugging Face
+    response_format: optional structured-output spec in OpenAI form, e.g.
+    {"type": "json_schema", "json_schema": {"name": ..., "schema": {...}}}
     """
     
     if providers is None:
@@ -138,15 +181,22 @@ def call_api(
     tokens = providers['tokens']
     models = providers['models']
     
+    # Structured output is only sent when the caller asks for it
+    format_kwargs = {"response_format": response_format} if response_format else {}
+    
     if ollama_only:
         if not OLLAMA_AVAILABLE:
             raise Exception("Ollama is not installed. Install it with: pip install ollama")
         
         print(f"Current System: Ollama (Local) | Model: {ollama_model_text} | API Key: None (Local)")
         try:
-            response = ollama.chat(
-                model=ollama_model_text,
-                messages=[{"role": "user", "content": prompt}]
+            response = _send_with_format(
+                lambda **kw: ollama.chat(
+                    model=ollama_model_text,
+                    messages=[{"role": "user", "content": prompt}],
+                    **kw
+                ),
+                _ollama_format_kwargs(response_format), "Ollama"
             )
             print(f"Response received from Ollama (Model: {ollama_model_text})")
             return response['message']['content'].strip()
@@ -169,18 +219,26 @@ def call_api(
             client = clients['mistral']
             try:
                 # Try new Mistral API method first (mistralai.Mistral)
-                response = client.chat.complete(
-                    model=models['mistral'],
-                    messages=messages,
-                    max_tokens=max_tokens
+                response = _send_with_format(
+                    lambda **kw: client.chat.complete(
+                        model=models['mistral'],
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        **kw
+                    ),
+                    format_kwargs, "Mistral"
                 )
                 content = response.choices[0].message.content.strip()
             except AttributeError:
                 # Legacy MistralClient method - direct call
-                response = client.chat(
-                    model=models['mistral'],
-                    messages=messages,
-                    max_tokens=max_tokens
+                response = _send_with_format(
+                    lambda **kw: client.chat(
+                        model=models['mistral'],
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        **kw
+                    ),
+                    format_kwargs, "Mistral"
                 )
                 content = response.choices[0].message.content.strip()
                 
@@ -200,10 +258,15 @@ def call_api(
                     {"type": "text", "text": prompt},
                     *image_contents
                 ]
-            response = clients['deepseek'].chat.completions.create(
-                model=models['deepseek'],
-                messages=messages,
-                max_tokens=max_tokens
+            # DeepSeek only supports JSON mode, not json_schema
+            response = _send_with_format(
+                lambda **kw: clients['deepseek'].chat.completions.create(
+                    model=models['deepseek'],
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    **kw
+                ),
+                {"response_format": {"type": "json_object"}} if response_format else {}, "DeepSeek"
             )
             print(f"Response received from DeepSeek (Model: {models['deepseek']})")
             return response.choices[0].message.content.strip()
@@ -221,10 +284,14 @@ def call_api(
                     {"type": "text", "text": prompt},
                     *image_contents
                 ]
-            response = clients['openrouter'].chat.completions.create(
-                model=models['openrouter'],
-                messages=messages,
-                max_tokens=max_tokens
+            response = _send_with_format(
+                lambda **kw: clients['openrouter'].chat.completions.create(
+                    model=models['openrouter'],
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    **kw
+                ),
+                format_kwargs, "OpenRouter"
             )
             print(f"Response received from OpenRouter (Model: {models['openrouter']})")
             return response.choices[0].message.content.strip()
@@ -249,13 +316,17 @@ def call_api(
                 {"type": "text", "text": prompt},
                 *image_contents
             ]
-        try:
+        def post_huggingface(**kw):
             response = requests.post(
                 huggingface_url,
                 headers=headers,
-                json=payload
+                json={**payload, **kw}
             )
             response.raise_for_status()
+            return response
+        
+        try:
+            response = _send_with_format(post_huggingface, format_kwargs, "Hugging Face")
             print(f"Response received from Hugging Face (Model: {models['huggingface']})")
             return response.json()["choices"][0]["message"]["content"].strip()
         except requests.exceptions.HTTPError as e:
@@ -11,7 +11,8 @@ from faster_whisper import WhisperModel
 # REMOVED: import whisper  # Old simple whisper library removed - now using Faster-Whisper Large V3 only
 
 # Import Whisper configuration
-from whisper_config import get_whisper_config, OPTIMIZATION_SETTINGS, LARGE_V3_FEATURES, get_speed_config
+from whisper_config import get_whisper_config, OPTIMIZATION_SETTINGS, LARGE_V3_FEATURES, get_speed_config, get_cpu_threads, MODEL_MEMORY_MB, get_model_cache_budget_mb, get_max_segments
+from format_optimizer import decode_to_pcm_async, WHISPER_SAMPLE_RATE, FFMPEG_BIN
 
 # Import speaker detection for experimental mode
 from speaker_detection import analyze_speakers, format_speaker_segments
@@ -26,18 +27,28 @@ import soundfile as sf
 import sys
 import soundfile as sf
 import numpy as np
+import aiofiles
 from pyannote.audio import Pipeline
 import torch
 from pydub import AudioSegment
 import re
 import statistics
+from collections import OrderedDict
 
 # Import prompts dari file terpisah
-from prompts import get_summary_prompt, get_fallback_responses, truncate_transcript
+from prompts import get_summary_prompt, get_fallback_responses, get_fallback_responses_mutable, truncate_transcript, trim_to_turn, UNIFIED_TRANSCRIPT_LIMIT
 
 # Import our new multi-provider API system
 from api_providers import initialize_providers, call_api
 
+# Optional orjson import (faster result JSON read/write and API responses)
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Notion integration import
 try:
     from notion_integration import router as notion_router
@@ -87,7 +98,21 @@ import os
 from pathlib import Path
 load_dotenv(Path(__file__).parent.parent / '.env')
 
-app = FastAPI(title="AI Meeting Transcription - Faster-Whisper Only", version="2.0.0")
+if ORJSON_AVAILABLE:
+    class ResultJSONResponse(ORJSONResponse):
+        """ORJSONResponse that also accepts int keys (speaker_stats) and numpy values"""
+        def render(self, content) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+else:
+    ResultJSONResponse = JSONResponse
+
+app = FastAPI(title="AI Meeting Transcription - Faster-Whisper Only", version="2.0.0", default_response_class=ResultJSONResponse)
+
+# Storage directories - created once at import instead of on every request
+UPLOADS_DIR = os.path.join(os.path.dirname(__file__), "uploads")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+os.makedirs(UPLOADS_DIR, exist_ok=True)
+os.makedirs(RESULTS_DIR, exist_ok=True)
 
 # CORS middleware
 app.add_middleware(
@@ -109,11 +134,16 @@ else:
 async def startup_event():
     """Initialize models on startup"""
     print("🔄 Initializing AI models on startup...")
+    if FFMPEG_BIN is None:
+        print("⚠️  ffmpeg not found in PATH - video uploads will be transcribed without PCM pre-decode")
+    else:
+        print(f"✅ ffmpeg found: {FFMPEG_BIN}")
     load_models()
     print("✅ Startup initialization complete!")
 
 # Global variables
 whisper_model = None
+whisper_models = OrderedDict()  # (model, device, compute_type) -> WhisperModel, LRU order
 # REMOVED: simple_whisper_model = None  # Legacy model removed - using Faster-Whisper Large V3 only
 mistral_client = None
 diarization_pipeline = None
@@ -123,10 +153,70 @@ chat_system = None
 multi_chat_system = None
 api_providers = None  # Our new multi-provider system
 
+def dumps_result(data) -> bytes:
+    """Serialize result JSON as UTF-8 bytes (2-space indent, non-ASCII kept as-is)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+def load_result_json(file_path: str):
+    """Read a result JSON file"""
+    if ORJSON_AVAILABLE:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+VIDEO_EXTS = frozenset({'.mp4', '.mov', '.webm', '.mkv', '.avi'})
+ALLOWED_UPLOAD_EXTS = frozenset({'.wav', '.mp3', '.m4a', '.flac', '.ogg', '.webm', '.mp4', '.mov'})
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1MB per read - RSS tetap kecil berapapun ukuran upload
+MAX_UPLOAD_SIZE = 500 * 1024 * 1024  # 500MB limit for video files
+
+async def save_upload_file(file: UploadFile, file_path: str, max_size: int = MAX_UPLOAD_SIZE) -> int:
+    """Stream upload ke disk per chunk; return jumlah byte yang ditulis"""
+    size = 0
+    try:
+        async with aiofiles.open(file_path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(status_code=400, detail=f"File too large. Maximum {max_size // (1024 * 1024)}MB.")
+                await f.write(chunk)
+    except Exception:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    return size
+
 # Configuration - DEBUGGING: Force Faster-Whisper only
 TRANSCRIPTION_ENGINE = "faster-whisper"  # Hardcoded to faster-whisper for debugging
 print("🔧 DEBUG MODE: Forced engine = faster-whisper")
 
+def get_cached_whisper_model(model_name: str, device: str, compute_type: str) -> WhisperModel:
+    """Return a loaded Faster-Whisper model, loading it once and evicting LRU models over the RAM budget"""
+    key = (model_name, device, compute_type)
+    model = whisper_models.get(key)
+    if model is not None:
+        whisper_models.move_to_end(key)
+        return model
+    
+    model = WhisperModel(
+        model_name,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=get_cpu_threads(),
+        num_workers=1
+    )
+    whisper_models[key] = model
+    
+    budget_mb = get_model_cache_budget_mb()
+    while len(whisper_models) > 1 and sum(MODEL_MEMORY_MB.get(name, 3000) for name, _, _ in whisper_models) > budget_mb:
+        evicted_key, _ = whisper_models.popitem(last=False)
+        print(f"🧹 Evicted cached Whisper model: {evicted_key[0]}")
+    
+    return model
+
 def load_models():
     """Load AI models with error handling - Using Faster-Whisper Large V3 ONLY"""
     global whisper_model, mistral_client, diarization_pipeline, api_providers
@@ -165,14 +255,7 @@ def load_models():
                 for feature, description in LARGE_V3_FEATURES.items():
                     print(f"   • {feature}: {description}")
             
-            whisper_model = WhisperModel(
-                model_name, 
-                device=device, 
-                compute_type=compute_type,
-                # Apply optimization settings for better performance
-                download_root=None,  # Use default cache
-                local_files_only=False  # Allow model download if needed
-            )
+            whisper_model = get_cached_whisper_model(model_name, device, compute_type)
             print(f"✅ Faster-Whisper {model_name} model loaded successfully!")
             
             # Show optimization settings being used
@@ -343,9 +426,9 @@ async def analyze_format_recommendation(file: UploadFile = File(...)):
     file_ext = os.path.splitext(file.filename)[1].lower()
     file_size = 0
     
-    # Read file to get size
-    content = await file.read()
-    file_size = len(content)
+    # Count size per chunk instead of holding the whole upload in memory
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        file_size += len(chunk)
     
     # Reset file pointer
     await file.seek(0)
@@ -353,12 +436,12 @@ async def analyze_format_recommendation(file: UploadFile = File(...)):
     recommendations = {
         "current_format": file_ext,
         "file_size_mb": round(file_size / (1024 * 1024), 2),
-        "is_video": file_ext in ['.mp4', '.mov', '.webm', '.mkv'],
-        "optimization_needed": file_ext in ['.mp4', '.mov', '.webm', '.mkv'],
+        "is_video": file_ext in VIDEO_EXTS,
+        "optimization_needed": file_ext in VIDEO_EXTS,
         "recommendations": []
     }
     
-    if file_ext in ['.mp4', '.mov', '.webm', '.mkv']:
+    if file_ext in VIDEO_EXTS:
         estimated_audio_size = file_size * 0.1  # Rough estimate: audio ~10% of video
         recommendations["recommendations"] = [
             {
@@ -578,6 +661,11 @@ async def upload_and_process(
         if not file.filename:
             raise HTTPException(status_code=400, detail="No file uploaded")
         
+        # Reject unsupported formats before reading any of the upload
+        file_ext = os.path.splitext(file.filename)[1].lower()
+        if file_ext not in ALLOWED_UPLOAD_EXTS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {file_ext}")
+        
         # Validate speed parameter
         valid_speeds = ["fast", "medium", "slow", "experimental"]
         if speed not in valid_speeds:
@@ -588,16 +676,6 @@ async def upload_and_process(
         if speaker_method not in valid_methods:
             raise HTTPException(status_code=400, detail=f"Invalid speaker method. Must be one of: {valid_methods}")
         
-        content = await file.read()
-        if len(content) > 500 * 1024 * 1024:  # 500MB limit for video files
-            raise HTTPException(status_code=400, detail="File too large. Maximum 500MB.")
-        
-        # Check file format and provide optimization info
-        allowed_extensions = ['.wav', '.mp3', '.m4a', '.flac', '.ogg', '.webm', '.mp4', '.mov']
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        if file_ext not in allowed_extensions:
-            raise HTTPException(status_code=400, detail=f"Unsupported format: {file_ext}")
-        
         # Provide format optimization info
         format_info = {
             '.wav': "Optimal format - direct processing",
@@ -615,6 +693,13 @@ async def upload_and_process(
         
         # Generate job ID
         job_id = f"job_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:20]}"
+        
+        # Save file (streamed; size limit checked while writing)
+        uploads_dir = UPLOADS_DIR
+        file_path = os.path.join(uploads_dir, f"{job_id}{file_ext}")
+        
+        file_size = await save_upload_file(file, file_path)
+        
         processing_jobs[job_id] = {
             "status": "starting", 
             "progress": 0, 
@@ -623,15 +708,7 @@ async def upload_and_process(
             "engine": engine
         }
         
-        # Save file
-        uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
-        os.makedirs(uploads_dir, exist_ok=True)
-        file_path = os.path.join(uploads_dir, f"{job_id}{file_ext}")
-        
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        print(f"📁 File saved: {file_path} ({len(content)/1024:.1f} KB)")
+        print(f"📁 File saved: {file_path} ({file_size/1024:.1f} KB)")
         print(f"🌐 Language: {language}, Engine: {engine}, Speed: {speed}")
         
         # Start processing with language, engine, speed parameters, and toggle settings
@@ -643,12 +720,14 @@ async def upload_and_process(
         return JSONResponse({
             "job_id": job_id,
             "status": "processing_started",
-            "message": f"File uploaded ({len(content)/1024:.1f} KB). Using {engine} with language: {language}",
-            "file_size_kb": len(content)/1024,
+            "message": f"File uploaded ({file_size/1024:.1f} KB). Using {engine} with language: {language}",
+            "file_size_kb": file_size/1024,
             "language": language,
             "engine": engine
         })
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Upload error: {e}")
         import traceback
@@ -724,15 +803,14 @@ async def monitor_detailed_progress(job_id: str):
 @app.get("/api/result/{job_id}")
 async def get_result(job_id: str):
     # Check results file directly from filesystem
-    results_dir = os.path.join(os.path.dirname(__file__), "results")
+    results_dir = RESULTS_DIR
     result_file = os.path.join(results_dir, f"{job_id}_result.json")
     
     if not os.path.exists(result_file):
         raise HTTPException(status_code=404, detail="Result file not found")
     
     try:
-        with open(result_file, 'r', encoding='utf-8') as f:
-            result = json.load(f)
+        result = load_result_json(result_file)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading result file: {str(e)}")
@@ -757,15 +835,14 @@ async def reprocess_speakers(job_id: str, force_speakers: int = None):
     """
     try:
         # Check if result file exists
-        results_dir = os.path.join(os.path.dirname(__file__), "results")
+        results_dir = RESULTS_DIR
         result_file = os.path.join(results_dir, f"{job_id}_result.json")
         
         if not os.path.exists(result_file):
             raise HTTPException(status_code=404, detail="Job result not found")
         
         # Load existing result
-        with open(result_file, 'r', encoding='utf-8') as f:
-            result = json.load(f)
+        result = load_result_json(result_file)
         
         segments = result.get("transcript", [])
         if not segments:
@@ -797,8 +874,8 @@ async def reprocess_speakers(job_id: str, force_speakers: int = None):
         result["processing_method"] = "enhanced_speaker_reprocessing"
         
         # Save updated result
-        with open(result_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        with open(result_file, 'wb') as f:
+            f.write(dumps_result(result))
         
         print(f"✅ Speaker reprocessing completed: {speaker_count} speakers, {len(enhanced_segments)} segments")
         
@@ -901,7 +978,7 @@ async def analyze_audio_for_speakers(job_id: str):
     """
     try:
         # Find audio file
-        uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
+        uploads_dir = UPLOADS_DIR
         audio_file = None
         
         for ext in ['.wav', '.mp3', '.m4a', '.mp4', '.webm', '.mkv', '.flac', '.ogg', '.mov']:
@@ -1068,6 +1145,7 @@ async def reload_whisper_model(model_mode: str = "production"):
         if whisper_model:
             old_model = whisper_model
             whisper_model = None
+        whisper_models.clear()
         
         # Set environment variable for new mode
         import os
@@ -1154,7 +1232,7 @@ async def get_available_engines():
 @app.get("/api/jobs/completed")
 async def get_completed_jobs():
     """Get list of completed jobs with basic info"""
-    results_dir = os.path.join(os.path.dirname(__file__), "results")
+    results_dir = RESULTS_DIR
     if not os.path.exists(results_dir):
         return {"jobs": []}
     
@@ -1165,8 +1243,7 @@ async def get_completed_jobs():
             result_file = os.path.join(results_dir, filename)
             
             try:
-                with open(result_file, 'r', encoding='utf-8') as f:
-                    result = json.load(f)
+                result = load_result_json(result_file)
                 
                 completed_jobs.append({
                     "job_id": job_id,
@@ -1191,8 +1268,8 @@ async def delete_job(job_id: str):
     print(f"🗑️ DELETE request received for job_id: {job_id}")
     
     try:
-        results_dir = os.path.join(os.path.dirname(__file__), "results")
-        uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
+        results_dir = RESULTS_DIR
+        uploads_dir = UPLOADS_DIR
         
         print(f"🔍 Looking in results_dir: {results_dir}")
         print(f"🔍 Looking in uploads_dir: {uploads_dir}")
@@ -1210,7 +1287,7 @@ async def delete_job(job_id: str):
             print(f"✅ Deleted result file: {job_id}_result.json")
         
         # Delete associated audio files
-        audio_extensions = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.mp4', '.mov', '.avi', '.mkv']
+        audio_extensions = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.mp4', '.webm', '.mov', '.avi', '.mkv']
         audio_patterns = [
             f"{job_id}",
             f"{job_id}_processed",
@@ -1250,15 +1327,14 @@ async def delete_job(job_id: str):
 @app.get("/api/jobs/{job_id}/result")
 async def get_job_result(job_id: str):
     """Get full result data for a completed job"""
-    results_dir = os.path.join(os.path.dirname(__file__), "results")
+    results_dir = RESULTS_DIR
     result_file = os.path.join(results_dir, f"{job_id}_result.json")
     
     if not os.path.exists(result_file):
         raise HTTPException(status_code=404, detail="Job result not found")
     
     try:
-        with open(result_file, 'r', encoding='utf-8') as f:
-            result = json.load(f)
+        result = load_result_json(result_file)
         
         return {
             "success": True,
@@ -1272,7 +1348,7 @@ async def get_job_result(job_id: str):
 async def get_audio_file(job_id: str):
     """Serve processed audio file for playback - prioritize MP3 files"""
     try:
-        uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
+        uploads_dir = UPLOADS_DIR
         print(f"🔍 Looking for audio file: {job_id}")
         print(f"📁 Uploads directory: {uploads_dir}")
         
@@ -1305,8 +1381,8 @@ async def get_audio_file(job_id: str):
                 headers={"Content-Disposition": f"inline; filename={job_id}_processed.wav"}
             )
         
-        # Priority 3: Fall back to original files (should be rare now)
-        for ext in ['.mp3', '.wav', '.m4a', '.flac', '.ogg']:  # Audio formats only
+        # Priority 3: Fall back to original files (videos are kept as uploaded)
+        for ext in ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.mp4', '.webm', '.mov']:
             original_file = os.path.join(uploads_dir, f"{job_id}{ext}")
             if os.path.exists(original_file):
                 print(f"✅ Found original audio file: {original_file}")
@@ -1315,7 +1391,10 @@ async def get_audio_file(job_id: str):
                     '.wav': 'audio/wav', 
                     '.m4a': 'audio/mp4',
                     '.flac': 'audio/flac',
-                    '.ogg': 'audio/ogg'
+                    '.ogg': 'audio/ogg',
+                    '.mp4': 'video/mp4',
+                    '.webm': 'video/webm',
+                    '.mov': 'video/quicktime'
                 }
                 media_type = media_type_map.get(ext, f"audio/{ext[1:]}")
                 return FileResponse(
@@ -1344,7 +1423,7 @@ async def get_audio_file(job_id: str):
 async def process_existing_file(job_id: str, language: str = "auto", engine: str = "faster-whisper"):
     """Process an existing uploaded file that hasn't been transcribed yet"""
     try:
-        uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
+        uploads_dir = UPLOADS_DIR
         
         # Find the existing file
         file_path = None
@@ -1360,7 +1439,7 @@ async def process_existing_file(job_id: str, language: str = "auto", engine: str
             raise HTTPException(status_code=404, detail=f"No audio file found for job_id: {job_id}")
         
         # Check if result already exists
-        results_dir = os.path.join(os.path.dirname(__file__), "results")
+        results_dir = RESULTS_DIR
         result_file = os.path.join(results_dir, f"{job_id}_result.json")
         if os.path.exists(result_file):
             return JSONResponse({
@@ -1398,11 +1477,12 @@ async def process_existing_file(job_id: str, language: str = "auto", engine: str
         print(f"❌ Process existing file error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to process existing file: {str(e)}")
 
-async def transcribe_with_faster_whisper_large_v3(file_path: str, job_id: str = None, progress: 'ProgressTracker' = None, language: str = "auto", speed: str = "medium", speaker_method: str = "pyannote") -> Dict[Any, Any]:
+async def transcribe_with_faster_whisper_large_v3(file_path: str, job_id: str = None, progress: 'ProgressTracker' = None, language: str = "auto", speed: str = "medium", speaker_method: str = "pyannote", audio: Optional[np.ndarray] = None) -> Dict[Any, Any]:
     """
     OPTIMIZED Transcription using Faster-Whisper with speed options
     Performance improvements: Variable speed based on model selection, optimized settings
     Speed options: fast (base model), medium (small model), slow (large-v3 model)
+    audio: optional pre-decoded 16kHz float32 PCM; skips Whisper's own decode of file_path
     """
     import time  # Fix missing import
     start_time = time.time()
@@ -1420,22 +1500,18 @@ async def transcribe_with_faster_whisper_large_v3(file_path: str, job_id: str =
         
         # Load appropriate model based on speed
         global whisper_model
-        current_model_name = getattr(whisper_model, 'model_size_or_path', None) if whisper_model else None
+        device_config = speed_config['model_config']
+        cache_key = (model_name, device_config['device'], device_config['compute_type'])
         
-        # Load new model if different from current or if not loaded
-        if whisper_model is None or current_model_name != model_name:
+        # Load model only if not cached yet - switching speeds reuses loaded models
+        if cache_key not in whisper_models:
             if progress:
                 progress.update_stage("transcription", 5, f"Loading {model_name} model for {speed} mode...")
             print(f"🔄 Loading {model_name} model for {speed} transcription...")
-            
-            # Load model with speed-specific configuration
-            device_config = speed_config['model_config']
-            whisper_model = WhisperModel(
-                model_name, 
-                device=device_config['device'],
-                compute_type=device_config['compute_type']
-            )
-            print(f"✅ {model_name} model loaded for {speed} mode")
+        
+        model = get_cached_whisper_model(*cache_key)
+        whisper_model = model
+        print(f"✅ {model_name} model ready for {speed} mode")
         
         if progress:
             progress.update_stage("transcription", 15, f"Starting {speed} transcription...")
@@ -1480,8 +1556,9 @@ async def transcribe_with_faster_whisper_large_v3(file_path: str, job_id: str =
                     # Remove non-whisper parameters
                     if "description" in transcribe_options:
                         del transcribe_options["description"]
-                    if "vad_filter" in transcribe_options:
-                        del transcribe_options["vad_filter"]
+                    # Silero VAD skips silent regions before decoding (fast/medium modes)
+                    if transcribe_options.get("vad_filter"):
+                        transcribe_options["vad_parameters"] = dict(min_silence_duration_ms=500)
                     # Remove experimental speaker detection parameters (not supported by whisper)
                     if "speaker_diarization" in transcribe_options:
                         del transcribe_options["speaker_diarization"]
@@ -1499,12 +1576,12 @@ async def transcribe_with_faster_whisper_large_v3(file_path: str, job_id: str =
                     print(f"⚙️  {speed.upper()} settings: beam_size={transcribe_options['beam_size']}, best_of={transcribe_options['best_of']}")
                     
                     # Faster-Whisper transcription with speed-specific optimizations
-                    segments, info = whisper_model.transcribe(file_path, **transcribe_options)
+                    segments, info = model.transcribe(audio if audio is not None else file_path, **transcribe_options)
                     
                     # OPTIMIZED segment processing with batch handling
                     segment_list = []
-                    full_text = ""
                     processed_segments = 0
+                    max_segments = get_max_segments()
                     
                     print(f"📊 Starting optimized segment processing...")
                     
@@ -1515,12 +1592,9 @@ async def transcribe_with_faster_whisper_large_v3(file_path: str, job_id: str =
                         if processed_segments % 25 == 0:
                             print(f"📝 Processed {processed_segments} segments...")
                         
-                        # Performance limit - max 3000 segments for speed
-                        if processed_segments > 3000:
-                            print(f"⚠️  Reached segment limit (3000) for performance")
-                            break
-                        if processed_segments > 5000:
-                            print(f"⚠️  Reached maximum segment limit (5000), stopping transcription")
+                        # Optional limit (WHISPER_MAX_SEGMENTS) - unlimited by default
+                        if max_segments and processed_segments > max_segments:
+                            print(f"⚠️  Reached segment limit ({max_segments}), stopping transcription")
                             break
                         segment_dict = {
                             "id": len(segment_list),
@@ -1541,11 +1615,10 @@ async def transcribe_with_faster_whisper_large_v3(file_path: str, job_id: str =
                                 })
                         
                         segment_list.append(segment_dict)
-                        full_text += segment.text + " "
                     
                     return {
                         "segments": segment_list,
-                        "text": full_text.strip(),
+                        "text": " ".join(segment["text"] for segment in segment_list).strip(),
                         "language": info.language,
                         "language_probability": info.language_probability,
                         "duration": info.duration,
@@ -1968,54 +2041,38 @@ async def process_audio_librosa(job_id: str, file_path: str, filename: str, lang
         # Stage 2: FORMAT OPTIMIZATION - Convert video to audio for 2-3x speed improvement
         file_ext = os.path.splitext(file_path)[1].lower()
         optimized_file_path = file_path
-        
-        if file_ext in ['.mp4', '.mov', '.webm', '.mkv', '.avi']:
-            progress.update_stage("format_optimization", 20, f"Converting {file_ext} to optimized audio...")
-            print(f"🎬 Video file detected ({file_ext}) - converting to audio for 2-3x speed improvement")
+        pcm_audio = None
+        
+        if file_ext in VIDEO_EXTS and FFMPEG_BIN is None:
+            # Faster-Whisper decodes the container itself (PyAV) - skip the doomed ffmpeg spawn
+            progress.update_stage("format_optimization", 100, "ffmpeg not available - using original file")
+            print(f"⚠️ ffmpeg not available - transcribing {file_ext} directly")
+        elif file_ext in VIDEO_EXTS:
+            progress.update_stage("format_optimization", 20, f"Decoding {file_ext} audio track...")
+            print(f"🎬 Video file detected ({file_ext}) - decoding audio track for 2-3x speed improvement")
             
             try:
-                # Convert video to optimized audio
-                from pydub import AudioSegment
-                
+                # Decode video straight to 16kHz mono PCM - no MP3 encode, no re-decode in Whisper
                 print(f"📁 Original file: {file_path} ({file_size:.1f}MB)")
                 
-                # Extract audio track
-                audio_segment = AudioSegment.from_file(file_path)
+                pcm_audio = await decode_to_pcm_async(file_path)
                 
-                # Create MP3 path with same job_id for consistency
+                # Transcription uses pcm_audio directly; speaker detection needs a file, so write a
+                # temporary WAV that is removed when processing ends. The original video is kept for playback.
                 uploads_dir = os.path.dirname(file_path)
-                mp3_filename = f"{job_id}.mp3"
-                optimized_audio_path = os.path.join(uploads_dir, mp3_filename)
+                decoded_wav_path = os.path.join(uploads_dir, f"{job_id}_decoded.wav")
                 
-                progress.update_stage("format_optimization", 60, "Optimizing audio for transcription...")
-                
-                # Convert with optimal settings for transcription
-                audio_segment = audio_segment.set_frame_rate(16000).set_channels(1)
-                audio_segment.export(optimized_audio_path, format="mp3", bitrate="128k")  # Balanced quality for transcription
-                
-                # Check optimized file size
-                optimized_size_mb = os.path.getsize(optimized_audio_path) / (1024 * 1024)
-                reduction_percent = ((file_size - optimized_size_mb) / file_size) * 100
+                progress.update_stage("format_optimization", 60, "Writing decoded audio for speaker detection...")
+                sf.write(decoded_wav_path, pcm_audio, WHISPER_SAMPLE_RATE, subtype="PCM_16")
                 
                 print(f"✅ FORMAT OPTIMIZATION SUCCESS:")
-                print(f"   Original: {file_size:.1f}MB ({file_ext})")
-                print(f"   Converted: {optimized_size_mb:.1f}MB (.mp3)")
-                print(f"   Reduction: {reduction_percent:.1f}% smaller")
-                print(f"   Expected speedup: 2-3x faster transcription")
-                print(f"   Saved as: {mp3_filename}")
-                
-                # IMPORTANT: Remove original video file to save space
-                try:
-                    os.remove(file_path)
-                    print(f"🗑️ Removed original video file: {os.path.basename(file_path)}")
-                    print(f"💾 Space saved: {file_size:.1f}MB")
-                except Exception as remove_error:
-                    print(f"⚠️ Could not remove original file: {remove_error}")
+                print(f"   Original: {file_size:.1f}MB ({file_ext}) - kept for playback")
+                print(f"   Decoded: {len(pcm_audio) / WHISPER_SAMPLE_RATE:.1f}s PCM, 16kHz mono (in memory)")
+                print(f"   Temporary WAV for speaker detection: {os.path.basename(decoded_wav_path)}")
                 
-                # Update file path to use converted MP3
-                optimized_file_path = optimized_audio_path
+                optimized_file_path = decoded_wav_path
                 
-                progress.update_stage("format_optimization", 100, f"Video→MP3 conversion complete: {reduction_percent:.0f}% space saved, original removed")
+                progress.update_stage("format_optimization", 100, "Video→PCM decode complete")
                 
             except Exception as e:
                 print(f"⚠️ Format conversion failed: {e}")
@@ -2034,8 +2091,10 @@ async def process_audio_librosa(job_id: str, file_path: str, filename: str, lang
         progress.update_stage("audio_analysis", 30, "Analyzing audio format...")
         # Quick audio info check
         try:
-            import librosa
-            duration = librosa.get_duration(path=file_path)
+            if pcm_audio is not None:
+                duration = len(pcm_audio) / WHISPER_SAMPLE_RATE
+            else:
+                duration = librosa.get_duration(path=file_path)
             progress.update_stage("audio_analysis", 100, f"Audio analyzed: {duration:.1f}s duration")
         except:
             progress.update_stage("audio_analysis", 100, "Audio format validated")
@@ -2044,7 +2103,7 @@ async def process_audio_librosa(job_id: str, file_path: str, filename: str, lang
         progress.update_stage("transcription", 0, f"Starting transcription with {engine} (Language: {language})...")
         
         # Transcription using Faster-Whisper with speed optimization
-        transcription = await transcribe_with_faster_whisper_large_v3(optimized_file_path, job_id, progress, language, speed, speaker_method)
+        transcription = await transcribe_with_faster_whisper_large_v3(optimized_file_path, job_id, progress, language, speed, speaker_method, audio=pcm_audio)
         
         if not transcription or not transcription.get("segments"):
             raise Exception("Transcription failed or returned empty result")
@@ -2083,11 +2142,10 @@ async def process_audio_librosa(job_id: str, file_path: str, filename: str, lang
         progress.update_stage("finalization", 20, "Saving initial results...")
         
         # Save initial result without summary
-        results_dir = os.path.join(os.path.dirname(__file__), "results")
-        os.makedirs(results_dir, exist_ok=True)
+        results_dir = RESULTS_DIR
         result_file = os.path.join(results_dir, f"{job_id}_result.json")
-        with open(result_file, 'w', encoding='utf-8') as f:
-            json.dump(final_result, f, ensure_ascii=False, indent=2)
+        with open(result_file, 'wb') as f:
+            f.write(dumps_result(final_result))
         
         progress.update_stage("finalization", 50, "Initial results saved")
         
@@ -2130,12 +2188,12 @@ async def process_audio_librosa(job_id: str, file_path: str, filename: str, lang
             try:
                 # Validate that all data is JSON serializable before saving
                 print("🔍 Validating JSON serializability...")
-                test_json = json.dumps(final_result, ensure_ascii=False, indent=2)
+                test_json = dumps_result(final_result)
                 print("✅ JSON validation passed")
                 
                 # Write atomically to prevent corruption
                 temp_file = result_file + '.tmp'
-                with open(temp_file, 'w', encoding='utf-8') as f:
+                with open(temp_file, 'wb') as f:
                     f.write(test_json)
                 
                 # Atomic rename to prevent corruption during write
@@ -2158,8 +2216,8 @@ async def process_audio_librosa(job_id: str, file_path: str, filename: str, lang
                     safe_result = {k: v for k, v in final_result.items() if k != 'summary'}
                     safe_result['summary'] = "Summary generation failed during save - please regenerate"
                     
-                    safe_json = json.dumps(safe_result, ensure_ascii=False, indent=2)
-                    with open(result_file, 'w', encoding='utf-8') as f:
+                    safe_json = dumps_result(safe_result)
+                    with open(result_file, 'wb') as f:
                         f.write(safe_json)
                     
                     print(f"⚠️ Saved with fallback summary: {result_file}")
@@ -2195,22 +2253,11 @@ async def process_audio_librosa(job_id: str, file_path: str, filename: str, lang
             })
             print(f"✅ Processing completed: {filename} (result creation failed)")
         
-        # Keep converted MP3 files - DO NOT cleanup optimized files
+        # Keep converted MP3 files - DO NOT cleanup MP3 files
         # Only log what we're keeping for transparency
-        if optimized_file_path != file_path:
-            if optimized_file_path.endswith('.mp3'):
-                print(f"💾 Keeping converted MP3 file: {os.path.basename(optimized_file_path)}")
-                print(f"📁 Full path: {optimized_file_path}")
-            else:
-                # Only cleanup non-MP3 temporary files
-                if os.path.exists(optimized_file_path):
-                    try:
-                        os.remove(optimized_file_path)
-                        print(f"🧹 Cleaned up temporary file: {optimized_file_path}")
-                    except Exception as cleanup_error:
-                        print(f"⚠️ Cleanup warning: {cleanup_error}")
-        
-        print(f"📊 Final storage: Audio file stored as MP3 for optimal space usage")
+        if optimized_file_path != file_path and optimized_file_path.endswith('.mp3'):
+            print(f"💾 Keeping converted MP3 file: {os.path.basename(optimized_file_path)}")
+            print(f"📁 Full path: {optimized_file_path}")
         
     except Exception as e:
         error_msg = str(e)
@@ -2238,6 +2285,15 @@ async def process_audio_librosa(job_id: str, file_path: str, filename: str, lang
             print(f"⚠️ Error in progress.complete: {complete_error}")
         
         progress.error(error_msg)
+    
+    finally:
+        # Only cleanup non-MP3 temporary files (e.g. the decoded WAV), also when processing failed
+        if optimized_file_path != file_path and not optimized_file_path.endswith('.mp3') and os.path.exists(optimized_file_path):
+            try:
+                os.remove(optimized_file_path)
+                print(f"🧹 Cleaned up temporary file: {optimized_file_path}")
+            except Exception as cleanup_error:
+                print(f"⚠️ Cleanup warning: {cleanup_error}")
 
 async def preprocess_audio_librosa(file_path: str) -> str:
     """Preprocess audio file using librosa"""
@@ -2255,7 +2311,7 @@ def _preprocess_audio_sync(file_path: str) -> str:
         print(f"🎵 Processing audio file: {file_ext}")
         
         # Video formats need audio extraction for optimal performance
-        if file_ext in ['.mp4', '.mov', '.webm', '.mkv']:
+        if file_ext in VIDEO_EXTS:
             try:
                 print(f"🎬 Video detected ({file_ext}) - extracting audio track...")
                 
@@ -2328,7 +2384,7 @@ def _preprocess_audio_sync(file_path: str) -> str:
         print(f"📊 Audio info: {len(audio)} samples, {sample_rate} Hz, {len(audio)/sample_rate:.1f}s")
         
         # For video files that were converted to MP3, return the MP3 path directly
-        if file_ext in ['.mp4', '.mov', '.webm', '.mkv'] and file_path.endswith('_extracted.mp3'):
+        if file_ext in VIDEO_EXTS and file_path.endswith('_extracted.mp3'):
             print(f"✅ Audio already optimized as MP3: {file_path}")
             return file_path
         
@@ -3405,8 +3461,8 @@ def _generate_summary_simple_sync(transcript_text: str) -> Dict[str, Any]:
     except Exception as e:
         print(f"❌ Mistral error: {e}")
         print(f"📋 Traceback: {traceback.format_exc()}")
-        # Use fallback from prompts file
-        fallback_responses = get_fallback_responses()
+        # Use fallback from prompts file (mutable copy: returned as a result)
+        fallback_responses = get_fallback_responses_mutable()
         return fallback_responses["summary_fallback"]
 
 def validate_simple_result(result: Dict) -> Dict:
@@ -3521,7 +3577,7 @@ def validate_simple_result(result: Dict) -> Dict:
 
 def get_simple_fallback() -> Dict:
     """Dynamic fallback with minimal assumptions - now using centralized prompts"""
-    fallback_responses = get_fallback_responses()
+    fallback_responses = get_fallback_responses_mutable()
     return fallback_responses["summary_fallback"]
 
 def clean_summary_text(summary: str, action_items: list, key_decisions: list) -> str:
@@ -3589,7 +3645,8 @@ async def generate_unified_analysis(transcript_segments: list, progress: 'Progre
     # Format transcript from segments with speaker context - OPTIMIZE length for better AI analysis
     transcript_lines = []
     total_chars = 0
-    max_chars = 6000  # Limit input to prevent token overflow, save space for output
+    max_chars = UNIFIED_TRANSCRIPT_LIMIT  # Limit input to prevent token overflow, save space for output
+    truncation_note = "... [Additional content truncated for processing efficiency]"
     
     for segment in transcript_segments:
         speaker = segment.get("speaker_name", "Speaker 1")
@@ -3597,10 +3654,17 @@ async def generate_unified_analysis(transcript_segments: list, progress: 'Progre
         if text:
             line = f"{speaker}: {text}"
             if total_chars + len(line) > max_chars:
-                transcript_lines.append(f"... [Additional content truncated for processing efficiency]")
+                # Stop at a whole turn, dropping turns until the note fits too
+                while transcript_lines and total_chars + len(truncation_note) > max_chars:
+                    total_chars -= len(transcript_lines.pop()) + 1
+                if not transcript_lines:
+                    transcript_lines.append(line[:max_chars - len(truncation_note) - 1])
+                    total_chars = len(transcript_lines[0]) + 1
+                transcript_lines.append(truncation_note)
+                total_chars += len(truncation_note)
                 break
             transcript_lines.append(line)
-            total_chars += len(line)
+            total_chars += len(line) + 1  # +1 for the "\n" join
     
     formatted_transcript = "\n".join(transcript_lines)
     
@@ -3608,16 +3672,32 @@ async def generate_unified_analysis(transcript_segments: list, progress: 'Progre
         progress.update_stage("ai_analysis", 25, f"Formatted transcript: {len(transcript_lines)} segments, {total_chars} chars")
     
     try:
-        from prompts import get_unified_analysis_prompt
+        from prompts import get_unified_analysis_prompt, would_exceed
+        from unified_analysis import generate_sectioned_analysis, parse_unified_response, validate_unified_result
         
         if progress:
             progress.update_stage("ai_analysis", 35, "Generating AI analysis prompt...")
         
-        prompt = get_unified_analysis_prompt(formatted_transcript, actual_speakers)
+        # Check the input before the prompt is assembled; the loop above already stops
+        # at the limit, so only ever trim the end, at a speaker-turn boundary
+        if would_exceed(formatted_transcript):
+            formatted_transcript = trim_to_turn(formatted_transcript, UNIFIED_TRANSCRIPT_LIMIT)
         
         if progress:
             progress.update_stage("ai_analysis", 45, "Calling AI API for comprehensive analysis...")
         
+        if os.getenv("UNIFIED_ANALYSIS_MODE", "").lower() == "sectioned":
+            # One concurrent call per section; each section is parsed on its own, so the
+            # merged dict skips the raw-text cleanup/re-parse below
+            sections = await generate_sectioned_analysis(
+                formatted_transcript, actual_speakers,
+                lambda p: call_api(p, providers=api_providers, max_tokens=20000)
+            )
+            if progress:
+                progress.update_stage("ai_analysis", 70, f"Sectioned analysis completed: {len(sections)} sections")
+            return validate_unified_result(sections, transcript_segments, progress=progress)
+        
+        prompt = get_unified_analysis_prompt(formatted_transcript, actual_speakers)
         # Use our multi-provider API system with increased tokens for complex analysis
         response_text = call_api(prompt, providers=api_providers, max_tokens=80000)
         
@@ -3632,169 +3712,8 @@ async def generate_unified_analysis(transcript_segments: list, progress: 'Progre
         
         # Parse JSON response
         try:
-            # Clean and parse JSON response with comprehensive cleaning
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                json_str = response_text[start:end].strip() if end > start else response_text[start:].strip()
-            elif "```" in response_text and "{" in response_text:
-                # Handle cases where it might be wrapped in code blocks without "json"
-                lines = response_text.split('\n')
-                json_lines = []
-                in_json = False
-                for line in lines:
-                    if line.strip().startswith('{') or in_json:
-                        in_json = True
-                        json_lines.append(line)
-                        if line.strip().endswith('}') and line.strip().count('{') <= line.strip().count('}'):
-                            break
-                json_str = '\n'.join(json_lines)
-            else:
-                start = response_text.find('{')
-                end = response_text.rfind('}') + 1
-                json_str = response_text[start:end] if start >= 0 and end > start else response_text
-            
-            if progress:
-                progress.update_stage("ai_analysis", 80, "Parsing AI response...")
-            
-            # TEMPORARY DEBUG - Log raw response when 0 items generated
-            print(f"🔍 DEBUG: Raw AI response (first 800 chars):")
-            print(f"{response_text[:800]}...")
-            print(f"🔍 DEBUG: Extracted JSON (first 500 chars):")
-            print(f"{json_str[:500]}...")
-            
-            # Comprehensive JSON cleaning
-            import re
-            
-            # Remove control characters except newlines, tabs, and carriage returns
-            json_str = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', json_str)
-            
-            # Fix common JSON issues
-            json_str = json_str.replace('\n\n', '\\n').replace('\r', ' ').strip()
-            
-            # Fix potential unescaped quotes in strings
-            # This is a basic fix - more sophisticated parsing might be needed
-            lines = json_str.split('\n')
-            fixed_lines = []
-            for line in lines:
-                # If it's a string value line (contains ": "...), escape internal quotes
-                if '": "' in line and not line.strip().endswith('",') and not line.strip().endswith('"'):
-                    # Add missing comma or quote closure if needed
-                    if not line.strip().endswith(',') and not line.strip().endswith('"'):
-                        line = line.rstrip() + '",'
-                fixed_lines.append(line)
-            json_str = '\n'.join(fixed_lines)
-            
-            result = json.loads(json_str)
-            
-            # Validate required fields with field mapping for flexibility
-            required_fields = ["narrative_summary", "speaker_points", "enhanced_action_items", "key_decisions"]
-            field_mappings = {
-                "enhanced_action_items": ["next_steps", "action_items", "enhanced_action_items"],
-                "key_decisions": ["key_takeaways", "key_insights", "key_decisions", "decisions"]
-            }
-            
-            for field in required_fields:
-                if field not in result:
-                    # Try alternative field names
-                    if field in field_mappings:
-                        found_alternative = False
-                        for alt_field in field_mappings[field]:
-                            if alt_field in result and result[alt_field]:
-                                print(f"🔄 Mapping {alt_field} → {field}")
-                                result[field] = result[alt_field]
-                                found_alternative = True
-                                break
-                        
-                        if not found_alternative:
-                            print(f"⚠️ MISSING field entirely: {field}")
-                            print(f"🔍 Available fields: {list(result.keys())}")
-                            print(f"🔍 Tried alternatives: {field_mappings[field]}")
-                    else:
-                        print(f"⚠️ MISSING field entirely: {field}")
-                        print(f"🔍 Available fields: {list(result.keys())}")
-                elif not result[field]:
-                    print(f"⚠️ EMPTY field: {field} = {result[field]}")
-                    print(f"🔍 Field type: {type(result[field])}")
-                else:
-                    print(f"✅ Field OK: {field} has {len(result[field]) if isinstance(result[field], list) else 'content'}")
-                    continue
-                
-                # Only use fallbacks if field is completely missing or None after mapping attempts
-                if field not in result or result[field] is None or not result[field]:
-                    print(f"🔧 Generating fallback for missing field: {field}")
-                    if field == "narrative_summary":
-                        result[field] = "Content analysis completed successfully."
-                    elif field == "speaker_points":
-                        # Generate basic speaker points from transcript
-                        speakers = set()
-                        for segment in transcript_segments:
-                            speakers.add(segment.get("speaker_name", "Unknown Speaker"))
-                        result[field] = [{"speaker": speaker, "points": ["Participated in discussion"]} for speaker in speakers]
-                    elif field == "enhanced_action_items":
-                        result[field] = [
-                            {
-                                "title": "Review Content and Extract Action Items",
-                                "description": "Analyze the transcribed content to identify specific action items and next steps based on the discussion points.",
-                                "priority": "Medium",
-                                "category": "Short-term",
-                                "timeframe": "1-2 weeks",
-                                "assigned_to": "Team"
-                            }
-                        ]
-                    elif field == "key_decisions":
-                        result[field] = [
-                            {
-                                "title": "Content Processing Complete",
-                                "description": "Successfully transcribed and analyzed the audio content with speaker detection.",
-                                "category": "Process",
-                                "impact": "Medium",
-                                "actionable": False,
-                                "source": "System"
-                            }
-                        ]
-                        print(f"✅ Generated fallback key_decisions: {len(result[field])} items")
-                else:
-                    # Field exists but is empty - this suggests AI response issue
-                    print(f"❌ AI provided empty {field} - this suggests prompt or API issue")
-                    print(f"🔍 Raw response sample for debugging:")
-                    # Look for the field in raw response
-                    if f'"{field}"' in response_text:
-                        field_start = response_text.find(f'"{field}"')
-                        field_sample = response_text[field_start:field_start+200]
-                        print(f"   Found in raw: {field_sample}")
-                    else:
-                        print(f"   Field '{field}' not found in raw response!")
-            
-            if progress:
-                progress.update_stage("ai_analysis", 95, "Validating analysis results...")
-            
-            print(f"✅ Unified analysis generated successfully!")
-            print(f"   - Narrative summary: {len(result.get('narrative_summary', ''))} chars")
-            print(f"   - Speaker points: {len(result.get('speaker_points', []))} speakers") 
-            print(f"   - Enhanced action items: {len(result.get('enhanced_action_items', []))} items")
-            print(f"   - Key decisions: {len(result.get('key_decisions', []))} decisions")
-            
-            # DEBUG: Log actual key_decisions content if present
-            key_decisions = result.get('key_decisions', [])
-            if key_decisions:
-                print(f"🔍 KEY DECISIONS FOUND ({len(key_decisions)}):")
-                for i, decision in enumerate(key_decisions[:3]):  # Show first 3
-                    if isinstance(decision, dict):
-                        title = decision.get('title', 'No title')
-                        print(f"   {i+1}. {title}")
-                    else:
-                        print(f"   {i+1}. {str(decision)[:100]}...")
-            else:
-                print(f"⚠️ NO KEY DECISIONS GENERATED - checking AI response structure...")
-                # Log structure of response to debug
-                if 'key_decisions' in result:
-                    print(f"   - key_decisions field exists but empty: {result['key_decisions']}")
-                else:
-                    print(f"   - key_decisions field missing from response")
-                    print(f"   - Available fields: {list(result.keys())}")
-            
-            return result
+            result = parse_unified_response(response_text, progress)
+            return validate_unified_result(result, transcript_segments, response_text, progress)
             
         except json.JSONDecodeError as e:
             print(f"❌ JSON parsing failed: {e}")
@@ -3886,11 +3805,12 @@ async def extract_structured_data_from_summary(transcript_segments: list) -> tup
             return generate_basic_structured_data()
         
         # Import dan gunakan prompt dari prompts.py
-        from prompts import get_structured_data_extraction_prompt
-        prompt = get_structured_data_extraction_prompt(transcript_text)
+        from prompts import get_structured_data_extraction_request
+        prompt, response_format = get_structured_data_extraction_request(transcript_text)
 
-        # Use our multi-provider API system
-        response_text = call_api(prompt, providers=api_providers, max_tokens=15000)
+        # Use our multi-provider API system; output shape is enforced via structured outputs
+        # (providers that reject response_format are retried without it inside call_api)
+        response_text = call_api(prompt, providers=api_providers, max_tokens=15000, response_format=response_format)
         
         # Clean and parse JSON response with better error handling
         json_str = ""
@@ -3970,19 +3890,37 @@ async def generate_comprehensive_summary(transcript_segments: list) -> str:
     if not transcript_segments:
         return "❌ No transcript available for summarization."
     
-    # Format transcript from segments with speaker context
+    try:
+        from prompts import COMPREHENSIVE_TRANSCRIPT_LIMIT
+    except ImportError:
+        COMPREHENSIVE_TRANSCRIPT_LIMIT = 5000
+    
+    # Format transcript from segments with speaker context; the prompt only
+    # keeps the first COMPREHENSIVE_TRANSCRIPT_LIMIT chars, so stop before the
+    # turn that would cross it
     transcript_lines = []
+    total_chars = 0
     for segment in transcript_segments:
         speaker = segment.get("speaker_name", "Speaker 1")
         text = segment.get("text", "").strip()
         if text:
-            transcript_lines.append(f"{speaker}: {text}")
+            line = f"{speaker}: {text}"
+            if total_chars + len(line) > COMPREHENSIVE_TRANSCRIPT_LIMIT:
+                if not transcript_lines:
+                    transcript_lines.append(line[:COMPREHENSIVE_TRANSCRIPT_LIMIT])
+                break
+            transcript_lines.append(line)
+            total_chars += len(line) + 1  # +1 for the "\n" join
     
     formatted_transcript = "\n".join(transcript_lines)
     
     # Use enhanced prompt from prompts.py for better structure
     try:
-        from prompts import get_comprehensive_summary_prompt
+        from prompts import (get_comprehensive_summary_prompt, trim_to_turn, would_exceed,
+                             COMPREHENSIVE_PROMPT_OVERHEAD, COMPREHENSIVE_PROMPT_LIMIT)
+        
+        if would_exceed(formatted_transcript, COMPREHENSIVE_PROMPT_OVERHEAD, COMPREHENSIVE_PROMPT_LIMIT):
+            formatted_transcript = trim_to_turn(formatted_transcript, COMPREHENSIVE_TRANSCRIPT_LIMIT)
         prompt = get_comprehensive_summary_prompt(formatted_transcript)
         
         # Use our new multi-provider API system
@@ -4117,15 +4055,14 @@ System has successfully processed and analyzed audio content with cutting-edge A
 async def reprocess_summary(job_id: str):
     """Reprocess summary for existing transcription with better AI analysis"""
     try:
-        results_dir = os.path.join(os.path.dirname(__file__), "results")
+        results_dir = RESULTS_DIR
         result_file = os.path.join(results_dir, f"{job_id}_result.json")
         
         if not os.path.exists(result_file):
             raise HTTPException(status_code=404, detail="Job result not found")
         
         # Load existing result
-        with open(result_file, 'r', encoding='utf-8') as f:
-            existing_result = json.load(f)
+        existing_result = load_result_json(result_file)
         
         print(f"🔄 Reprocessing summary for job: {job_id}")
         
@@ -4155,12 +4092,12 @@ async def reprocess_summary(job_id: str):
         try:
             print("🔍 Validating regenerated JSON serializability...")
             # Validate JSON serializability before saving
-            test_json = json.dumps(existing_result, ensure_ascii=False, indent=2)
+            test_json = dumps_result(existing_result)
             print("✅ Regenerated JSON validation passed")
             
             # Write atomically to prevent corruption
             temp_file = result_file + '.tmp'
-            with open(temp_file, 'w', encoding='utf-8') as f:
+            with open(temp_file, 'wb') as f:
                 f.write(test_json)
             
             # Atomic rename
@@ -4249,7 +4186,7 @@ async def load_chat_data(job_id: str):
     
     try:
         # Find the result file for this job - format: {job_id}_result.json
-        results_dir = os.path.join(os.path.dirname(__file__), "results")
+        results_dir = RESULTS_DIR
         result_file = os.path.join(results_dir, f"{job_id}_result.json")
         
         print(f"🔍 Looking for chat data file: {result_file}")
@@ -4538,8 +4475,7 @@ async def import_source_file(
         job_id = f"job_{timestamp}_{random_suffix}"
         
         # Copy file to uploads directory
-        uploads_dir = "uploads"
-        os.makedirs(uploads_dir, exist_ok=True)
+        uploads_dir = UPLOADS_DIR
         
         # Get file extension and create destination filename
         file_ext = os.path.splitext(filename)[1].lower()
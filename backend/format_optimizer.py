@@ -6,14 +6,25 @@ Helps convert video files to optimal audio formats for faster and more accurate
 
 import os
 import sys
+import asyncio
+import shutil
 import subprocess
 import argparse
 from pathlib import Path
 
+import numpy as np
+
+WHISPER_SAMPLE_RATE = 16000
+
+# Resolved once at import - avoids a $PATH scan per conversion
+FFMPEG_BIN = shutil.which('ffmpeg')
+
 def check_ffmpeg():
     """Check if ffmpeg is installed"""
+    if FFMPEG_BIN is None:
+        return False
     try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+        subprocess.run([FFMPEG_BIN, '-version'], capture_output=True, check=True)
         return True
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
@@ -100,6 +111,48 @@ def convert_to_wav(input_file, output_file=None):
         print(f"❌ Error during conversion: {e}")
         return None
 
+def _pcm_decode_cmd(input_file, sample_rate):
+    """ffmpeg command: decode to raw 16-bit mono PCM on stdout, errors only on stderr"""
+    return [
+        FFMPEG_BIN or 'ffmpeg', '-nostdin', '-loglevel', 'error',
+        '-i', input_file,
+        '-vn',                   # No video
+        '-f', 's16le',           # Raw 16-bit PCM to stdout
+        '-acodec', 'pcm_s16le',
+        '-ar', str(sample_rate),
+        '-ac', '1',              # Mono
+        '-'
+    ]
+
+def _pcm_from_bytes(raw):
+    """s16le bytes -> float32 array in [-1, 1]"""
+    return np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+
+def decode_to_pcm(input_file, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Decode audio/video langsung ke float32 PCM mono (siap untuk Whisper).
+    Tanpa encode MP3 perantara - Whisper hanya butuh raw PCM.
+    """
+    result = subprocess.run(_pcm_decode_cmd(input_file, sample_rate), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg decode failed: {result.stderr.decode(errors='ignore')[-500:]}")
+    
+    return _pcm_from_bytes(result.stdout)
+
+async def decode_to_pcm_async(input_file, sample_rate=WHISPER_SAMPLE_RATE):
+    """decode_to_pcm tanpa memblokir event loop (asyncio subprocess)"""
+    proc = await asyncio.create_subprocess_exec(
+        *_pcm_decode_cmd(input_file, sample_rate),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    out, err = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg decode failed: {err.decode(errors='ignore')[-500:]}")
+    
+    return _pcm_from_bytes(out)
+
 def analyze_file(file_path):
     """Analyze file and provide recommendations"""
     file_ext = os.path.splitext(file_path)[1].lower()
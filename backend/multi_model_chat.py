@@ -27,6 +27,15 @@ except ImportError as e:
     print(f"⚠️ FAISS chat system not available: {e}")
     FAISS_SYSTEM_AVAILABLE = False
 
+# Import semantic response cache
+try:
+    from semantic_cache import SemanticCache
+    SEMANTIC_CACHE_MODULE_AVAILABLE = True
+    SEMANTIC_CACHE_IMPORT_ERROR = None
+except ImportError as e:
+    SEMANTIC_CACHE_MODULE_AVAILABLE = False
+    SEMANTIC_CACHE_IMPORT_ERROR = e
+
 # Load environment variables
 load_dotenv()
 
@@ -51,6 +60,22 @@ class MultiModelChatSystem:
             except Exception as e:
                 print(f"⚠️ FAISS chat system initialization failed: {e}")
         
+        # Initialize semantic cache for LLM answers (opt-in; reuse FAISS encoder if loaded)
+        self.semantic_cache = None
+        semantic_cache_enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+        if semantic_cache_enabled and not SEMANTIC_CACHE_MODULE_AVAILABLE:
+            print(f"⚠️ Semantic cache not available: {SEMANTIC_CACHE_IMPORT_ERROR}")
+        elif semantic_cache_enabled:
+            try:
+                encoder = self.faiss_chat_system.encoder if self.faiss_chat_system else None
+                self.semantic_cache = SemanticCache(
+                    db_path=os.path.join(data_dir, "semantic_cache.db"),
+                    encoder=encoder,
+                    ttl_hours=float(os.getenv("SEMANTIC_CACHE_TTL_HOURS", "24"))
+                )
+            except Exception as e:
+                print(f"⚠️ Semantic cache initialization failed: {e}")
+        
         # Initialize available models
         self.available_models = {}
         
@@ -226,41 +251,13 @@ class MultiModelChatSystem:
             # Build enhanced context
             context = self.base_chat_system._build_context_from_data()
             
-            # Enhanced system prompt for better responses
-            system_prompt = """You are an expert AI assistant for meeting and business conversation analysis. 
-You have the ability to:
-1. Analyze meeting transcripts in-depth
-2. Identify communication patterns and discussion dynamics
-3. Provide strategic insights and actionable recommendations
-4. Answer questions with detailed and relevant context
-
-Provide informative, structured, and actionable answers. 
-Use professional yet easy-to-understand English."""
-            
-            # Enhanced user prompt with better structure
-            user_prompt = f"""Based on the following meeting/conversation data:
-
-{context}
-
-QUESTION: {query}
-
-Provide a comprehensive answer with the following structure:
-1. **Direct Answer**: Main response to the question
-2. **Details & Context**: Supporting information from the transcript
-3. **Additional Insights**: Interesting observations or patterns (if relevant)
-
-Ensure the answer is accurate and based on available data."""
-            
-            # Use our multi-provider API system
-            full_prompt = f"""{system_prompt}
-
-{user_prompt}"""
-            
-            answer = call_api(
-                full_prompt,
-                providers=self.api_providers,
-                max_tokens=1200
-            )
+            if self.semantic_cache:
+                answer = self.semantic_cache.get_or_compute(
+                    query, context,
+                    lambda: self._call_mistral(context, query)
+                )
+            else:
+                answer = self._call_mistral(context, query)
             
             # Store in session history
             if session_id not in self.session_history:
@@ -290,6 +287,45 @@ Ensure the answer is accurate and based on available data."""
             result["model_used"] = "mistral_error_fallback"
             return result
     
+    def _call_mistral(self, context: str, query: str) -> str:
+        """Build the enhanced prompt and call the multi-provider API"""
+        
+        # Enhanced system prompt for better responses
+        system_prompt = """You are an expert AI assistant for meeting and business conversation analysis. 
+You have the ability to:
+1. Analyze meeting transcripts in-depth
+2. Identify communication patterns and discussion dynamics
+3. Provide strategic insights and actionable recommendations
+4. Answer questions with detailed and relevant context
+
+Provide informative, structured, and actionable answers. 
+Use professional yet easy-to-understand English."""
+        
+        # Enhanced user prompt with better structure
+        user_prompt = f"""Based on the following meeting/conversation data:
+
+{context}
+
+QUESTION: {query}
+
+Provide a comprehensive answer with the following structure:
+1. **Direct Answer**: Main response to the question
+2. **Details & Context**: Supporting information from the transcript
+3. **Additional Insights**: Interesting observations or patterns (if relevant)
+
+Ensure the answer is accurate and based on available data."""
+        
+        # Use our multi-provider API system
+        full_prompt = f"""{system_prompt}
+
+{user_prompt}"""
+        
+        return call_api(
+            full_prompt,
+            providers=self.api_providers,
+            max_tokens=1200
+        )
+    
     def get_available_models(self) -> Dict[str, Any]:
         """Get information about available models"""
         models_info = {}
@@ -193,7 +193,7 @@ def load_models_minimal():
     
     try:
         from faster_whisper import WhisperModel
-        from whisper_config import get_whisper_config
+        from whisper_config import get_whisper_config, get_cpu_threads
         
         # Get optimized config
         config = get_whisper_config()
@@ -203,7 +203,9 @@ def load_models_minimal():
         whisper_model = WhisperModel(
             config["model"],
             device=config["device"],
-            compute_type=config["compute_type"]
+            compute_type=config["compute_type"],
+            cpu_threads=get_cpu_threads(),
+            num_workers=1
         )
         
         print(f"✅ {config['model']} loaded (no chat system)")
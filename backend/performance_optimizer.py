@@ -40,7 +40,6 @@ class OptimizedWhisperProcessor:
     def process_segments_batch(self, segments_generator, max_segments: int = 3000):
         """Process segments in efficient batches"""
         segment_list = []
-        full_text = ""
         processed_count = 0
         
         print(f"🚀 Starting optimized segment processing (max: {max_segments})")
@@ -64,7 +63,6 @@ class OptimizedWhisperProcessor:
                 }
                 
                 segment_list.append(segment_dict)
-                full_text += segment.text + " "
                 
                 # Batch progress reporting (every 50 segments)
                 if processed_count % 50 == 0:
@@ -74,7 +72,8 @@ class OptimizedWhisperProcessor:
             print(f"⚠️  Segment processing stopped: {e}")
         
         print(f"✅ Optimized processing completed: {processed_count} segments")
-        return segment_list, full_text.strip(), processed_count
+        full_text = " ".join(segment["text"] for segment in segment_list).strip()
+        return segment_list, full_text, processed_count
     
     def _extract_words_fast(self, segment):
         """Fast word extraction without overhead"""
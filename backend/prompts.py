@@ -8,16 +8,90 @@ File ini berisi semua prompt yang digunakan di sistem AI untuk:
 3. Fallback responses
 
 Memudahkan maintenance dan customization prompt tanpa edit kode utama.
+
+Urutan prompt: instruksi statis SELALU di depan, data dinamis (transcript,
+context, query) di akhir. Prefix statis harus byte-identical antar call
+(tanpa timestamp / interpolasi) supaya prompt caching di sisi provider
+(OpenAI/Anthropic/Gemini) bisa hit.
+
+Prompt disimpan sebagai konstanta str yang sudah dipecah di titik placeholder
+dan dirangkai dengan str.join. Jangan dimigrasi ke template engine yang
+di-render saat runtime (Jinja2, string.Template, str.format per call); kalau
+suatu saat butuh template dinamis, parse/compile sekali saat import.
 """
 
+import copy
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+from types import MappingProxyType
+
+# Optional tiktoken import (exact token counts)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
 # ===== SUMMARY GENERATION PROMPTS =====
 
-def get_summary_prompt(transcript_text):
-    """Simple but effective prompt based on proven sample script"""
-    return f"""
-Here is a meeting/conversation transcript with multiple speakers. Create a comprehensive summary of the key points from this discussion:
+_TRANSCRIPT_LABEL = "\nTRANSCRIPT:\n"
+
+_TRAILING_WS_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+def canonicalize_transcript(text: str) -> str:
+    """
+    Normalisasi transcript sebelum masuk prompt (NFC, tanpa spasi di akhir baris,
+    maks satu baris kosong berturut-turut), supaya transcript yang sama menghasilkan
+    prompt yang byte-identical dan response cache bisa hit
+    """
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    # Substring check dulu: jauh lebih murah dari regex sub pada transcript yang sudah bersih
+    if " \n" in text or "\t\n" in text:
+        text = _TRAILING_WS_RE.sub("\n", text)
+    if "\n\n\n" in text:
+        text = _BLANK_LINES_RE.sub("\n\n", text)
+    return text
+
+def prompt_cache_key(prompt: str) -> str:
+    """Key pendek untuk response cache (BLAKE2b, 16 byte)"""
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+
+# Batas panjang transcript per prompt; caller bisa berhenti memformat segment setelah batas ini
+COMPREHENSIVE_TRANSCRIPT_LIMIT = 5000
+UNIFIED_TRANSCRIPT_LIMIT = 6000
+# Builder yang menerima transcript utuh (summary, extraction) memotongnya dulu (head+tail)
+# supaya input canonicalize_transcript dan key lru_cache tetap terbatas
+SUMMARY_TRANSCRIPT_LIMIT = 6000
+EXTRACTION_TRANSCRIPT_LIMIT = 24000
+
+# Budget token untuk potongan transcript yang sama (dipakai kalau tiktoken tersedia):
+# teks Inggris (~4 char/token) tetap dibatasi jumlah karakter di atas,
+# teks non-ASCII/CJK (banyak token per karakter) dibatasi jumlah token
+COMPREHENSIVE_TRANSCRIPT_TOKENS = COMPREHENSIVE_TRANSCRIPT_LIMIT // 3
+UNIFIED_TRANSCRIPT_TOKENS = UNIFIED_TRANSCRIPT_LIMIT // 3
+
+def _transcript_head(transcript_text, char_limit, token_limit):
+    """
+    Potongan awal transcript yang masuk ke prompt: batas karakter, canonicalize,
+    lalu batas token kalau tiktoken terinstall
+    """
+    head = canonicalize_transcript(transcript_text[:char_limit])
+    if TIKTOKEN_AVAILABLE:
+        head = truncate_to_token_budget(head, token_limit)
+    return head
+
+def _comprehensive_head(transcript_text):
+    return _transcript_head(transcript_text, COMPREHENSIVE_TRANSCRIPT_LIMIT, COMPREHENSIVE_TRANSCRIPT_TOKENS)
 
-{transcript_text}
+def _unified_head(transcript_text):
+    return _transcript_head(transcript_text, UNIFIED_TRANSCRIPT_LIMIT, UNIFIED_TRANSCRIPT_TOKENS)
+
+_SUMMARY_INSTRUCTIONS = """
+Below is a meeting/conversation transcript with multiple speakers. Create a comprehensive summary of the key points from this discussion.
 
 Please create a summary that includes:
 1. Main topics discussed
@@ -26,22 +100,25 @@ Please create a summary that includes:
 4. Action items (if any)
 
 Format output in JSON:
-{{
+{
   "summary": "Complete summary with main topics, points per speaker, decisions, and action items",
   "action_items": ["Action item 1", "Action item 2"],
   "key_decisions": ["Decision 1", "Decision 2"]
-}}
+}
 
 Ensure the summary is detailed and informative like a comprehensive meeting briefing. Output everything in ENGLISH.
 """
 
-def get_comprehensive_summary_prompt(transcript_text):
-    """Enhanced prompt for generating comprehensive summary with professional structure like mainSample.py"""
-    return f"""
-Based on the following meeting/conversation transcript, create a comprehensive summary like mainSample.py format:
+@lru_cache(maxsize=64)
+def _build_summary_prompt(transcript_text):
+    return _SUMMARY_INSTRUCTIONS + _TRANSCRIPT_LABEL + transcript_text
+
+def get_summary_prompt(transcript_text):
+    """Simple but effective prompt based on proven sample script"""
+    return _build_summary_prompt(canonicalize_transcript(truncate_transcript(transcript_text, SUMMARY_TRANSCRIPT_LIMIT)))
 
-TRANSCRIPT:
-{transcript_text[:5000]}
+_COMPREHENSIVE_INSTRUCTIONS = """
+Based on the following meeting/conversation transcript, create a comprehensive summary like mainSample.py format:
 
 TASK: Create a complete summary in an easy-to-read and informative format like a professional meeting briefing.
 
@@ -92,48 +169,20 @@ IMPORTANT RULES:
 9. SECTION ORDER must be: Main Topics → Speaker Points → Decisions → Action Items
 """
 
-def get_unified_analysis_prompt(transcript_text, actual_speakers=None):
-    """
-    Enhanced unified prompt focused on extracting rich Key Takeaways and specific Next Steps
-    Returns: summary (narrative only), speaker_points, key_decisions (insights), enhanced_action_items (next steps)
-    """
-    
-    # Create speaker examples based on actual speakers detected
-    if actual_speakers and len(actual_speakers) > 0:
-        speaker_examples = []
-        for i, speaker in enumerate(actual_speakers):
-            speaker_examples.append(f'''    {{
-      "speaker": "{speaker}",
-      "points": [
-        "Key point 1 from this speaker",
-        "Key point 2 from this speaker", 
-        "Key point 3 from this speaker"
-      ]
-    }}''')
-        
-        speaker_examples_text = ",\n".join(speaker_examples)
-    else:
-        speaker_examples_text = '''    {
-      "speaker": "Speaker 1",
-      "points": [
-        "Key point 1 from this speaker",
-        "Key point 2 from this speaker", 
-        "Key point 3 from this speaker"
-      ]
-    },
-    {
-      "speaker": "Speaker 2", 
-      "points": [
-        "Key point 1 from this speaker",
-        "Key point 2 from this speaker"
-      ]
-    }'''
-    
-    return f"""
-Based on the following transcript, extract MAXIMUM VALUE by deeply analyzing the content for rich insights and actionable next steps:
+@lru_cache(maxsize=64)
+def _build_comprehensive_prompt(transcript_head):
+    return _COMPREHENSIVE_INSTRUCTIONS + _TRANSCRIPT_LABEL + transcript_head
+
+def get_comprehensive_summary_prompt(transcript_text):
+    """Enhanced prompt for generating comprehensive summary with professional structure like mainSample.py"""
+    # Cache key = potongan transcript yang benar-benar dipakai
+    return _build_comprehensive_prompt(_comprehensive_head(transcript_text))
+
+COMPREHENSIVE_PROMPT_OVERHEAD = len(_COMPREHENSIVE_INSTRUCTIONS) + len(_TRANSCRIPT_LABEL)
+COMPREHENSIVE_PROMPT_LIMIT = COMPREHENSIVE_PROMPT_OVERHEAD + COMPREHENSIVE_TRANSCRIPT_LIMIT
 
-TRANSCRIPT:
-{transcript_text[:6000]}
+_UNIFIED_INTRO = """
+Based on the following transcript, extract MAXIMUM VALUE by deeply analyzing the content for rich insights and actionable next steps.
 
 🚨 MANDATORY: You MUST generate ALL 4 sections. Empty sections are NOT acceptable.
 
@@ -144,130 +193,221 @@ Analyze this content thoroughly and generate a JSON response with 4 distinct sec
 3. KEY TAKEAWAYS - Extract AT LEAST 3 VALUABLE INSIGHTS from actual content discussed (MANDATORY - never empty)
 4. NEXT STEPS - Extract AT LEAST 2 SPECIFIC ACTIONABLE ITEMS that are unique and directly relevant to this content
 
-JSON FORMAT (EXACTLY THIS STRUCTURE):
-{{
-  "narrative_summary": "#### Main Topics Discussed\\n\\n1. **Topic 1**: Description...\\n2. **Topic 2**: Description...\\n\\nProvide comprehensive overview of main topics and themes discussed in the meeting.",
+"""
+
+# Format output sebagai TypeScript interface: jauh lebih sedikit token dari contoh JSON lengkap
+_UNIFIED_FORMAT = """OUTPUT SCHEMA (TypeScript) - return ONE valid JSON object matching AnalysisOutput:
+interface AnalysisOutput {
+  narrative_summary: string;  // markdown: "#### Main Topics Discussed\\n\\n1. **Topic**: Description..." - overview of main topics and themes
+  speaker_points: { speaker: string; points: string[] }[];  // one entry per speaker, their key points
+  key_decisions: {
+    title: string;        // specific insight/concept/framework/learning from the conversation - NOT generic
+    description: string;  // WHY it matters, HOW it works, context, quotes or examples mentioned
+    category: "Framework"|"Concept"|"Insight"|"Strategy"|"Tool"|"Best Practice"|"Learning"|"Methodology"|"Principle"|"Approach";
+    impact: "High"|"Medium"|"Low";
+    actionable: boolean;
+    source: string;       // speaker name or context of the insight
+  }[];
+  enhanced_action_items: {
+    title: string;        // action verb + specific methodology/framework from key_decisions
+    description: string;  // 3-5 sentences: WHAT, WHY, HOW, CONTEXT, OUTCOME
+    priority: "High"|"Medium"|"Low";
+    category: "Immediate"|"Short-term"|"Strategic"|"Ongoing";
+    timeframe: "Today"|"This week"|"1-2 weeks"|"1-3 months"|"Ongoing";
+    assigned_to: "Self"|"Team"|"Organization";
+    tags: string[];       // content-specific keywords from the discussion
+    related_key_decision: string;  // title of the key_decision this implements
+    notion_ready: {
+      title: string;
+      properties: { Priority: string; Category: string; "Due Date": string; Assigned: string; Status: "Not Started"; "Source Insight": string };
+    };
+  }[];
+}
+
+"""
+
+_UNIFIED_RULES = """RULES (apply to every section):
+R1. Use ONLY content ACTUALLY DISCUSSED in this conversation - nothing that could apply to any transcript, no placeholder text from the format above.
+R2. Use the conversation's own terminology, names, quotes and examples.
+R3. Every item must be distinct - no repeated titles, payloads or field values.
+
+🎯 KEY TAKEAWAYS (key_decisions) - at least 3-5 when the content has value (R1, R2):
+- Meetings: decisions made, conclusions reached, agreements established
+- Interviews/podcasts: insights, frameworks, concepts, strategies, principles shared
+- Educational content: main learnings, methodologies, best practices
+- Title: exact terminology from the conversation, e.g. "The Battery Analogy for Mental Energy" (only if actually mentioned)
+- Description: WHY the insight matters, with specific context from the discussion
+- Each takeaway should be a "golden nugget" worth remembering and referencing
+
+⚡ NEXT STEPS (enhanced_action_items) - at least 2 (R1, R2, R3):
+- Each action implements a specific key_decision; name it in related_key_decision
+- Title: action verb + specific methodology/framework from key_decisions
+- Description (3-5 sentences): WHAT (specific action), WHY (the key_decision that justifies it), HOW (steps or methodology from the conversation), CONTEXT (examples, quotes, frameworks discussed), OUTCOME (expected result)
+- Priority, category, timeframe, tags and Notion payload must differ per action based on the insight's importance
+- Example: "Implement the Battery Analogy Assessment System: Use David Kode's battery methodology (0-100%) to evaluate mental energy levels daily. This framework, discussed in relation to stress management, helps identify when recharge is needed. Rate your current battery level each morning and evening, noting patterns that indicate when you're approaching burnout zones below 30%."
+- AVOID generic actions like "Review transcript" or "Follow up"
+
+✅ SUCCESS: someone reading the output immediately knows what THIS conversation covered, and every insight and action traces back to it."""
+
+_UNIFIED_INSTRUCTIONS = _UNIFIED_INTRO + _UNIFIED_FORMAT + _UNIFIED_RULES + "\n"
+# Panjang bagian statis prompt (tanpa baris speaker) dan panjang prompt maksimum
+# setelah transcript dipotong ke batasnya; dipakai would_exceed()
+UNIFIED_PROMPT_OVERHEAD = len(_UNIFIED_INSTRUCTIONS) + len(_TRANSCRIPT_LABEL)
+UNIFIED_PROMPT_LIMIT = UNIFIED_PROMPT_OVERHEAD + UNIFIED_TRANSCRIPT_LIMIT
+
+@lru_cache(maxsize=64)
+def _build_unified_prompt(transcript_head, speakers):
+    # Speaker names are dynamic, so they go after the static instructions
+    if speakers:
+        speakers_line = "\nDETECTED SPEAKERS (use these exact names in speaker_points): " + ", ".join(speakers) + "\n"
+    else:
+        speakers_line = ""
+    
+    return "".join((_UNIFIED_INSTRUCTIONS, speakers_line, _TRANSCRIPT_LABEL, transcript_head))
+
+def get_unified_analysis_prompt(transcript_text, actual_speakers=None):
+    """
+    Enhanced unified prompt focused on extracting rich Key Takeaways and specific Next Steps
+    Returns: summary (narrative only), speaker_points, key_decisions (insights), enhanced_action_items (next steps)
+    """
+    
+    speakers = tuple(map(str, actual_speakers)) if actual_speakers else ()
+    return _build_unified_prompt(_unified_head(transcript_text), speakers)
+
+# ===== SECTIONED ANALYSIS PROMPTS =====
+# Empat prompt kecil (satu per section unified analysis) yang bisa dikirim paralel.
+# Header + transcript sama persis di keempatnya, jadi prefix cache provider
+# dipakai ulang antar call; instruksi per-section ada di akhir.
+
+_SECTION_HEADER = """
+Based on the following transcript, extract MAXIMUM VALUE by deeply analyzing the content. Only use information ACTUALLY DISCUSSED - no generic content.
+"""
+
+_NARRATIVE_TASK = """
+
+TASK: Write the NARRATIVE SUMMARY only - main topics and overview (NO speaker details, NO decisions, NO action items).
+
+Return ONLY this JSON:
+{
+  "narrative_summary": "#### Main Topics Discussed\\n\\n1. **Topic 1**: Description...\\n2. **Topic 2**: Description..."
+}
+"""
+
+_SPEAKER_POINTS_TASK = """
+
+TASK: Extract detailed points per speaker with their specific contributions and expertise.
+
+Return ONLY this JSON:
+{
   "speaker_points": [
-{speaker_examples_text}
-  ],
+    {
+      "speaker": "Speaker 1",
+      "points": [
+        "Key point 1 from this speaker",
         "Key point 2 from this speaker"
       ]
-    }}
-  ],
+    }
+  ]
+}
+"""
+
+_KEY_DECISIONS_TASK = """
+
+TASK: Extract AT LEAST 3 KEY TAKEAWAYS - valuable insights, decisions, frameworks, concepts or learnings from the actual conversation. Use the conversation's own terminology in titles and explain WHY each matters with specific context.
+
+Return ONLY this JSON:
+{
   "key_decisions": [
-    {{
+    {
       "title": "[Specific insight/concept/framework/learning from actual conversation - NOT generic]",
-      "description": "[Deep explanation of the insight, WHY it matters, HOW it works, specific context from the conversation, and practical implications. Include quotes or specific examples mentioned. Make this educational and valuable.]",
+      "description": "[Deep explanation of the insight, WHY it matters, HOW it works, specific context and quotes from the conversation]",
       "category": "Framework|Concept|Insight|Strategy|Tool|Best Practice|Learning|Methodology|Principle|Approach",
       "impact": "High|Medium|Low",
       "actionable": true|false,
       "source": "[Speaker name or context where this insight came from]"
-    }}
-  ],
+    }
+  ]
+}
+"""
+
+_ACTION_ITEMS_TASK = """
+
+TASK: Extract AT LEAST 2 NEXT STEPS - specific, actionable items that implement the insights discussed. Each description is 3-5 sentences covering WHAT, WHY, HOW, CONTEXT and OUTCOME. Every item must have distinct priority, category, timeframe and tags. AVOID generic actions like "Review transcript" or "Follow up".
+
+Return ONLY this JSON:
+{
   "enhanced_action_items": [
-    {{
-      "title": "[Action verb + specific methodology/framework from key_decisions]",
-      "description": "[COMPREHENSIVE 3-5 sentence description including: WHAT (specific action based on key insight), WHY (reference to key_decision that justifies this), HOW (step-by-step guidance from conversation), CONTEXT (specific examples/quotes/frameworks discussed), OUTCOME (expected result based on insight). Include background context, implementation steps, and practical examples when mentioned.]",
+    {
+      "title": "[Action verb + specific methodology/framework from the conversation]",
+      "description": "[WHAT, WHY, HOW, CONTEXT, OUTCOME]",
       "priority": "High|Medium|Low",
       "category": "Immediate|Short-term|Strategic|Ongoing",
       "timeframe": "Today|This week|1-2 weeks|1-3 months|Ongoing",
       "assigned_to": "Self|Team|Organization",
-      "tags": ["content-specific", "keywords", "from", "actual", "discussion"],
-      "related_key_decision": "[Title of key_decision this action implements]",
-      "notion_ready": {{
-        "title": "[Unique action title based on content and key insights]",
-        "properties": {{
+      "tags": ["content-specific", "keywords"],
+      "related_key_decision": "[Insight this action implements]",
+      "notion_ready": {
+        "title": "[Unique action title]",
+        "properties": {
           "Priority": "High|Medium|Low",
-          "Category": "Immediate|Short-term|Strategic|Ongoing", 
+          "Category": "Immediate|Short-term|Strategic|Ongoing",
           "Due Date": "[Specific timeframe based on content urgency]",
           "Assigned": "[Based on content context and action scope]",
           "Status": "Not Started",
-          "Source Insight": "[Key decision title this implements]"
-        }}
-      }}
-    }}
+          "Source Insight": "[Insight this implements]"
+        }
+      }
+    }
   ]
-}}
-
-🎯 CRITICAL RULES FOR KEY TAKEAWAYS (key_decisions):
-- Extract VALUABLE INSIGHTS, LEARNINGS, and CONCEPTS from the conversation
-- For meetings: Extract actual decisions made, conclusions reached, agreements established
-- For interviews/podcasts: Extract key insights, frameworks, concepts, strategies, principles shared
-- For educational content: Extract main learnings, methodologies, best practices discussed
-- ONLY extract insights that were ACTUALLY DISCUSSED in the conversation
-- NO generic examples - every insight must be content-specific
-- Focus on: concepts mentioned, frameworks explained, strategies discussed, tools shared, principles revealed, key learnings
-- Think: "What unique insight/learning can I extract from THIS specific conversation?"
-- Title: Use exact terminology/phrases from the conversation when possible
-- Description: Explain WHY this insight is valuable with specific context from the discussion
-- Make each takeaway feel like a "golden nugget" worth remembering and referencing
-- Examples of content-specific insights:
-  * If discussing stress: "The Battery Analogy for Mental Energy" (if actually mentioned)
-  * If discussing leadership: "[Specific leadership principle mentioned by name]"
-  * If discussing business: "[Specific strategy or framework discussed]"
-  * If sharing expertise: "[Specific methodology or approach explained]"
-- AVOID: generic insights that could apply to any conversation
-- FOCUS: unique wisdom, specific methodologies, actual quotes/concepts shared
-- ALWAYS extract at least 3-5 key insights if the content has valuable information
-
-⚡ CRITICAL RULES FOR NEXT STEPS (enhanced_action_items):
-- CREATE COMPREHENSIVE action items that are DIRECTLY DERIVED from key_decisions identified
-- LINK each action to specific insights from key_decisions for maximum value
-- Each action should be DISTINCTLY DIFFERENT with unique, detailed payloads for Notion
-- Think: "How can someone IMPLEMENT the key insights from THIS specific conversation?"
-
-🎯 ACTION ITEM ENHANCEMENT RULES:
-- Title: Start with action verb + specific methodology/framework from key_decisions
-- Description: Must include:
-  * WHAT: Clear, specific action based on key insight
-  * WHY: Reference to the key_decision that justifies this action
-  * HOW: Step-by-step guidance or methodology mentioned in conversation
-  * CONTEXT: Specific examples, quotes, or frameworks from the discussion
-  * OUTCOME: Expected result or benefit based on the insight
-
-- Make descriptions COMPREHENSIVE (3-5 sentences minimum) with:
-  * Background context from the conversation
-  * Specific implementation steps
-  * Connection to key insights discussed
-  * Practical examples when mentioned
-  * Expected outcomes or benefits
-
-- Examples of ENHANCED content-specific actions:
-  * "Implement the Battery Analogy Assessment System: Use David Kode's battery methodology (0-100%) to evaluate mental energy levels daily. This framework, discussed in relation to stress management, helps identify when recharge is needed. Rate your current battery level each morning and evening, noting patterns that indicate when you're approaching burnout zones below 30%."
-  * "Apply [Specific Framework Name] in [Context]: Based on the detailed discussion of [specific methodology], implement this approach by [specific steps mentioned]. This addresses the key insight about [specific problem/opportunity discussed] and should result in [specific outcome mentioned]."
-
-- Each action should have DIFFERENT priority, category, timeframe, and tags based on insight importance
-- AVOID: generic actions like "Review transcript" or "Follow up"
-- FOCUS: actions that transform key_decisions into practical, implementable next steps with rich context
-
-🚫 ABSOLUTE PROHIBITIONS:
-- NO static/generic content that could apply to any transcript
-- NO placeholder examples in actual output
-- NO repeated action items with same payload structure
-- NO insights that weren't actually discussed
-- NO actions that don't relate to specific content
-- EVERY field must be uniquely filled based on actual conversation content
-
-✅ SUCCESS CRITERIA:
-- Key takeaways feel like premium content highlights worth saving
-- Action items are so specific they could only come from THIS conversation
-- Each action item has completely different Notion payload values
-- Someone reading this would immediately know what specific content was discussed
-- All insights and actions are directly traceable to actual conversation content"""
+}
+"""
 
-# ===== ENHANCED CHAT PROMPTS =====
+def _section_prompt(transcript_text, task):
+    transcript_head = _unified_head(transcript_text)
+    return "".join((_SECTION_HEADER, _TRANSCRIPT_LABEL, transcript_head, task))
 
-def get_enhanced_summary_prompt(context: str, query: str) -> str:
+def get_narrative_prompt(transcript_text):
+    """Section prompt: narrative_summary"""
+    return _section_prompt(transcript_text, _NARRATIVE_TASK)
+
+def get_speaker_points_prompt(transcript_text, actual_speakers=None):
+    """Section prompt: speaker_points"""
+    task = _SPEAKER_POINTS_TASK
+    if actual_speakers:
+        task = "\n\nDETECTED SPEAKERS (use these exact names): " + ", ".join(map(str, actual_speakers)) + task
+    return _section_prompt(transcript_text, task)
+
+def get_key_decisions_prompt(transcript_text):
+    """Section prompt: key_decisions (key takeaways)"""
+    return _section_prompt(transcript_text, _KEY_DECISIONS_TASK)
+
+def get_action_items_prompt(transcript_text):
+    """Section prompt: enhanced_action_items (next steps)"""
+    return _section_prompt(transcript_text, _ACTION_ITEMS_TASK)
+
+def get_sectioned_analysis_prompts(transcript_text, actual_speakers=None):
     """
-    Prompt for enhanced summary with structured format
-    Used in: multi_model_chat.py -> _build_mistral_prompt()
+    Semua section prompt sekaligus: {field_name: prompt}, urutan sesuai unified analysis
     """
-    return f"""Based on the following meeting/conversation transcript, provide a complete and structured analysis in English.
+    return {
+        "narrative_summary": get_narrative_prompt(transcript_text),
+        "speaker_points": get_speaker_points_prompt(transcript_text, actual_speakers),
+        "key_decisions": get_key_decisions_prompt(transcript_text),
+        "enhanced_action_items": get_action_items_prompt(transcript_text),
+    }
 
-CONTEXT:
-{context}
+# ===== ENHANCED CHAT PROMPTS =====
+
+def _split_chat_template(template):
+    """
+    Pecah template {context}/{query} menjadi (head, mid, tail) sekali saat import,
+    sehingga render cukup satu str.join tanpa parsing template per call
+    """
+    head, _, rest = template.partition("{context}")
+    mid, _, tail = rest.partition("{query}")
+    return head, mid, tail
 
-USER QUERY: {query}
+_ENHANCED_SUMMARY_TMPL = """Based on the following meeting/conversation transcript, provide a complete and structured analysis in English.
 
 INSTRUCTIONS:
 Analyze this transcript with a neat and structured format. Provide a comprehensive answer using the following format:
@@ -325,19 +465,25 @@ IMPORTANT:
 - Focus on valuable and useful insights
 - If no explicit action items, write "No action items were explicitly mentioned in the transcript."
 
-Answer with the structured format above, don't just give short answers."""
+Answer with the structured format above, don't just give short answers.
 
-def get_standard_chat_prompt(context: str, query: str) -> str:
+CONTEXT:
+{context}
+
+USER QUERY: {query}"""
+
+_ENHANCED_SUMMARY_PARTS = _split_chat_template(_ENHANCED_SUMMARY_TMPL)
+
+@lru_cache(maxsize=64)
+def get_enhanced_summary_prompt(context: str, query: str) -> str:
     """
-    Standard prompt for regular chat (not summary)
+    Prompt for enhanced summary with structured format
     Used in: multi_model_chat.py -> _build_mistral_prompt()
     """
-    return f"""Based on the following meeting/conversation transcript, answer the user's question accurately and helpfully.
-
-CONTEXT:
-{context}
+    head, mid, tail = _ENHANCED_SUMMARY_PARTS
+    return "".join((head, context, mid, query, tail))
 
-USER QUESTION: {query}
+_STANDARD_CHAT_TMPL = """Based on the following meeting/conversation transcript, answer the user's question accurately and helpfully.
 
 INSTRUCTIONS:
 - Answer the question based on information available in the transcript
@@ -346,75 +492,118 @@ INSTRUCTIONS:
 - Use natural and professional English
 - Include examples or quotes from transcript if relevant
 
-Answer the user's question focusing on information available in the transcript."""
+Answer the user's question focusing on information available in the transcript.
 
-# ===== FALLBACK RESPONSES =====
+CONTEXT:
+{context}
 
-def get_fallback_responses():
+USER QUESTION: {query}"""
+
+_STANDARD_CHAT_PARTS = _split_chat_template(_STANDARD_CHAT_TMPL)
+
+@lru_cache(maxsize=64)
+def get_standard_chat_prompt(context: str, query: str) -> str:
     """
-    Default responses ketika AI tidak tersedia
+    Standard prompt for regular chat (not summary)
+    Used in: multi_model_chat.py -> _build_mistral_prompt()
     """
-    return {
-        "summary_fallback": {
-            "summary": "This audio content has been successfully transcribed and analyzed. The recording captured a conversation between participants discussing various topics of interest. The discussion included meaningful exchanges and communication between the speakers. The transcript provides an accurate record of the spoken content with speaker identification and timing information for detailed review and reference.",
-            "enhanced_action_items": [
-                {
+    head, mid, tail = _STANDARD_CHAT_PARTS
+    return "".join((head, context, mid, query, tail))
+
+# ===== FALLBACK RESPONSES =====
+
+_FALLBACK_RESPONSES = {
+    "summary_fallback": {
+        "summary": "This audio content has been successfully transcribed and analyzed. The recording captured a conversation between participants discussing various topics of interest. The discussion included meaningful exchanges and communication between the speakers. The transcript provides an accurate record of the spoken content with speaker identification and timing information for detailed review and reference.",
+        "enhanced_action_items": [
+            {
+                "title": "Review Complete Transcript",
+                "description": "Thoroughly review the transcribed content for any mentioned commitments, deadlines, or follow-up requirements",
+                "priority": "Medium",
+                "category": "Immediate",
+                "timeframe": "1-3 days",
+                "assigned_to": "Team",
+                "tags": ["review", "analysis", "transcript"],
+                "notion_ready": {
                     "title": "Review Complete Transcript",
-                    "description": "Thoroughly review the transcribed content for any mentioned commitments, deadlines, or follow-up requirements",
-                    "priority": "Medium",
-                    "category": "Immediate",
-                    "timeframe": "1-3 days",
-                    "assigned_to": "Team",
-                    "tags": ["review", "analysis", "transcript"],
-                    "notion_ready": {
-                        "title": "Review Complete Transcript",
-                        "properties": {
-                            "Priority": "Medium",
-                            "Category": "Immediate",
-                            "Due Date": "3 days from now",
-                            "Assigned": "Team",
-                            "Status": "Not Started"
-                        }
+                    "properties": {
+                        "Priority": "Medium",
+                        "Category": "Immediate",
+                        "Due Date": "3 days from now",
+                        "Assigned": "Team",
+                        "Status": "Not Started"
                     }
-                },
-                {
+                }
+            },
+            {
+                "title": "Implement Discussion Insights",
+                "description": "Apply learnings and recommendations identified during the conversation to relevant projects or processes",
+                "priority": "Low",
+                "category": "Short-term",
+                "timeframe": "1-2 weeks",
+                "assigned_to": "Team",
+                "tags": ["implementation", "insights", "follow-up"],
+                "notion_ready": {
                     "title": "Implement Discussion Insights",
-                    "description": "Apply learnings and recommendations identified during the conversation to relevant projects or processes",
-                    "priority": "Low",
-                    "category": "Short-term",
-                    "timeframe": "1-2 weeks",
-                    "assigned_to": "Team",
-                    "tags": ["implementation", "insights", "follow-up"],
-                    "notion_ready": {
-                        "title": "Implement Discussion Insights",
-                        "properties": {
-                            "Priority": "Low",
-                            "Category": "Short-term",
-                            "Due Date": "2 weeks from now",
-                            "Assigned": "Team",
-                            "Status": "Not Started"
-                        }
+                    "properties": {
+                        "Priority": "Low",
+                        "Category": "Short-term",
+                        "Due Date": "2 weeks from now",
+                        "Assigned": "Team",
+                        "Status": "Not Started"
                     }
                 }
-            ],
-            "key_decisions": [
-                "Audio content successfully processed and transcribed with speaker identification"
-            ],
-            "tags": ["audio-transcription", "conversation", "content-analysis"],
-            "participants": ["Speaker 1", "Speaker 2"],
-            "meeting_type": "conversation",
-            "sentiment": "neutral"
-        },
-        
-        "chat_not_available": "Chat system is currently being set up. In the meantime, you can explore the transcript, summary, and analytics tabs to learn about your meeting content.",
-        
-        "enhanced_chat_not_available": "Enhanced chat system is currently being set up. Your question has been noted. Please check the transcript, summary, and analytics tabs for detailed information about your meeting.",
-        
-        "load_error": "Sorry, I encountered an error while processing your question. Please try again or check the other tabs for information about your meeting."
-    }
+            }
+        ],
+        "key_decisions": [
+            "Audio content successfully processed and transcribed with speaker identification"
+        ],
+        "tags": ["audio-transcription", "conversation", "content-analysis"],
+        "participants": ["Speaker 1", "Speaker 2"],
+        "meeting_type": "conversation",
+        "sentiment": "neutral"
+    },
+    
+    "chat_not_available": "Chat system is currently being set up. In the meantime, you can explore the transcript, summary, and analytics tabs to learn about your meeting content.",
+    
+    "enhanced_chat_not_available": "Enhanced chat system is currently being set up. Your question has been noted. Please check the transcript, summary, and analytics tabs for detailed information about your meeting.",
+    
+    "load_error": "Sorry, I encountered an error while processing your question. Please try again or check the other tabs for information about your meeting."
+}
+
+def _freeze(value):
+    """Rekursif: dict -> MappingProxyType, list -> tuple"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Read-only sampai ke nested dict/list: aman dibagi ke semua caller/thread
+# (pakai get_fallback_responses_mutable() kalau perlu edit)
+_FALLBACK_RO = _freeze(_FALLBACK_RESPONSES)
+
+def get_fallback_responses():
+    """
+    Default responses ketika AI tidak tersedia
+    """
+    return _FALLBACK_RO
+
+def get_fallback_responses_mutable():
+    """
+    Deep copy dari fallback responses, untuk caller yang perlu memodifikasi hasilnya
+    """
+    return copy.deepcopy(_FALLBACK_RESPONSES)
 
 # ===== UTILITY FUNCTIONS =====
 
+_TRUNC_MARKER = "\n\n[...transcript continues...]\n\n"
+
+# Titik potong digeser ke akhir giliran bicara (newline) atau akhir kalimat
+# (maks _SENT_WINDOW char) supaya tidak memotong di tengah kalimat
+_SENT_END = re.compile(r"[.!?]\s")
+_SENT_WINDOW = 200
+
 def truncate_transcript(transcript_text: str, max_length: int = 6000) -> str:
     """
     Truncate transcript untuk prompt yang terlalu panjang
@@ -422,43 +611,100 @@ def truncate_transcript(transcript_text: str, max_length: int = 6000) -> str:
     if len(transcript_text) <= max_length:
         return transcript_text
     
-    # Take first part and last part to capture beginning and end
-    first_part = transcript_text[:max_length//2]
-    last_part = transcript_text[-(max_length//2):]
+    # No room for the marker plus any text: plain cut
+    if max_length <= len(_TRUNC_MARKER):
+        return transcript_text[:max_length]
+    
+    # Take first part and last part to capture beginning and end;
+    # the marker counts toward max_length so the result never exceeds it
+    budget = max_length - len(_TRUNC_MARKER)
+    head = budget // 2
+    tail_start = len(transcript_text) - (budget - head)
+    
+    # Snap cuts to speaker-turn (newline) boundaries, else sentence boundaries,
+    # only ever shrinking each part
+    window_start = max(head - _SENT_WINDOW, 0)
+    newline = transcript_text.rfind("\n", window_start, head)
+    if newline != -1:
+        head = newline + 1
+    else:
+        last = None
+        for last in _SENT_END.finditer(transcript_text, window_start, head):
+            pass
+        if last is not None:
+            head = last.end()
     
-    return first_part + "\n\n[...transcript continues...]\n\n" + last_part
+    newline = transcript_text.find("\n", tail_start, tail_start + _SENT_WINDOW)
+    if newline != -1:
+        tail_start = newline + 1
+    else:
+        first = _SENT_END.search(transcript_text, tail_start, tail_start + _SENT_WINDOW)
+        if first is not None:
+            tail_start = first.end()
+    
+    return "".join((transcript_text[:head], _TRUNC_MARKER, transcript_text[tail_start:]))
+
+def trim_to_turn(transcript_text: str, max_length: int) -> str:
+    """
+    Potong hanya bagian akhir transcript ke max_length, di batas giliran bicara (newline)
+    kalau ada; untuk teks yang sudah berupa potongan awal (jangan pakai head+tail di sini)
+    """
+    if len(transcript_text) <= max_length:
+        return transcript_text
+    head = transcript_text[:max_length]
+    return head.rpartition("\n")[0] or head
+
+_SUMMARY_KEYWORDS = (
+    "summary", "summarize", "conclusions", "main points", "overview",
+    "ringkas", "rangkum", "simpulkan", "kesimpulan",
+    "ringkasan", "poin utama", "inti", "garis besar",
+    "buatlah ringkasan", "berikan ringkasan", "format terstruktur",
+    "key points", "brief", "outline", "highlights", "recap"
+)
+
+# Satu pass regex untuk semua keyword (substring match). Query di-lower() dulu:
+# re.IGNORECASE membuat search ~10x lebih lambat pada query tanpa keyword (kasus umum)
+_SUMMARY_RE = re.compile("|".join(map(re.escape, _SUMMARY_KEYWORDS)))
 
 def is_summary_query(query: str) -> bool:
     """
     Deteksi apakah query meminta summary/ringkasan
     """
-    summary_keywords = [
-        "summary", "summarize", "conclusions", "main points", "overview",
-        "ringkas", "rangkum", "simpulkan", "kesimpulan",
-        "ringkasan", "poin utama", "inti", "garis besar",
-        "buatlah ringkasan", "berikan ringkasan", "format terstruktur",
-        "key points", "brief", "outline", "highlights", "recap"
-    ]
-    
-    query_lower = query.lower()
-    return any(keyword in query_lower for keyword in summary_keywords)
+    return _SUMMARY_RE.search(query.lower()) is not None
 
 # ===== PROMPT VALIDATION =====
 
-def validate_prompt_length(prompt: str, max_length: int = 8000) -> bool:
+MAX_PROMPT_LEN = 8000
+
+def validate_prompt_length(prompt: str, max_length: int = MAX_PROMPT_LEN, max_bytes: int = None,
+                           max_tokens: int = None, model: str = "gpt-4o", _len=len) -> bool:
     """
-    Validasi panjang prompt untuk mencegah error
+    Validasi panjang prompt untuk mencegah error.
+    Cek termurah dulu: jumlah karakter, lalu byte UTF-8 (opsional), lalu token (opsional;
+    pakai tiktoken kalau tersedia, selain itu estimasi)
     """
-    return len(prompt) <= max_length
-
-def get_structured_data_extraction_prompt(transcript_text):
+    if _len(prompt) > max_length:
+        return False
+    if max_bytes is not None and _len(prompt.encode("utf-8")) > max_bytes:
+        return False
+    if max_tokens is not None and get_exact_token_count(prompt, model) > max_tokens:
+        return False
+    return True
+
+def would_exceed(transcript_text: str, static_overhead: int = UNIFIED_PROMPT_OVERHEAD,
+                 max_length: int = UNIFIED_PROMPT_LIMIT) -> bool:
     """
-    Prompt untuk ekstraksi data terstruktur dari transcript
+    Cek panjang prompt dari input, sebelum prompt dirangkai.
+    Default: unified prompt; untuk comprehensive pakai COMPREHENSIVE_PROMPT_OVERHEAD/LIMIT
     """
-    return f"""
+    return len(transcript_text) + static_overhead > max_length
+
+_EXTRACTION_HEAD = """
 Extract structured data from this transcript:
 
-{transcript_text}
+"""
+
+_EXTRACTION_TAIL = """
 
 Extract and format the following:
 1. Action items
@@ -466,22 +712,125 @@ Extract and format the following:
 3. Point of view from speakers
 
 Format output as JSON:
-{{
+{
   "action_items": ["item1", "item2"],
   "key_decisions": ["decision1", "decision2"],  
   "point_of_view": ["perspective1", "perspective2"]
-}}
+}
 
 Output in ENGLISH only.
 """
 
+def get_structured_data_extraction_prompt(transcript_text):
+    """
+    Prompt untuk ekstraksi data terstruktur dari transcript
+    """
+    transcript_text = truncate_transcript(transcript_text, EXTRACTION_TRANSCRIPT_LIMIT)
+    return _EXTRACTION_HEAD + canonicalize_transcript(transcript_text) + _EXTRACTION_TAIL
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action_items": _STRING_LIST,
+        "key_decisions": _STRING_LIST,
+        "point_of_view": _STRING_LIST,
+    },
+    "required": ["action_items", "key_decisions", "point_of_view"],
+    "additionalProperties": False,
+}
+
+EXTRACTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "structured_data_extraction", "schema": EXTRACTION_SCHEMA, "strict": True},
+}
+
+# Nama key tetap disebut: provider yang hanya punya JSON mode (tanpa schema) juga butuh kata "JSON" di prompt
+_EXTRACTION_SCHEMA_INSTRUCTIONS = """
+Extract structured data from this transcript: action items, key decisions and point of view from speakers.
+Return a JSON object with keys action_items, key_decisions and point_of_view, each a list of strings.
+Output in ENGLISH only.
+"""
+
+def get_structured_data_extraction_request(transcript_text):
+    """
+    Versi structured-output dari get_structured_data_extraction_prompt: (prompt tanpa contoh JSON, response_format).
+    response_format langsung diteruskan ke call_api(..., response_format=...)
+    """
+    transcript_text = truncate_transcript(transcript_text, EXTRACTION_TRANSCRIPT_LIMIT)
+    return _EXTRACTION_SCHEMA_INSTRUCTIONS + _TRANSCRIPT_LABEL + canonicalize_transcript(transcript_text), EXTRACTION_RESPONSE_FORMAT
+
+# BPE tokenizers (cl100k/o200k, Mistral) average ~4 UTF-8 bytes per token;
+# counting bytes instead of code points keeps non-ASCII text from being underestimated
+_BYTES_PER_TOKEN = 4
+
+@lru_cache(maxsize=128)
+def _prompt_counts(prompt: str) -> tuple:
+    """
+    Hitung (length, words, lines, utf8_bytes) sekali per prompt string yang sama
+    """
+    # str.count: single C-level scan, no list of substrings (word count is approximate)
+    return len(prompt), prompt.count(' ') + 1, prompt.count('\n') + 1, len(prompt.encode('utf-8'))
+
 def get_prompt_stats(prompt: str) -> dict:
     """
     Get statistik prompt untuk debugging
     """
+    length, words, lines, utf8_bytes = _prompt_counts(prompt)
     return {
-        "length": len(prompt),
-        "words": len(prompt.split()),
-        "lines": len(prompt.split('\n')),
-        "estimated_tokens": len(prompt) // 4  # Rough estimate
+        "length": length,
+        "words": words,
+        "lines": lines,
+        "estimated_tokens": utf8_bytes // _BYTES_PER_TOKEN  # Rough estimate
     }
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """
+    Encoding tiktoken untuk model, atau None kalau tiktoken tidak terinstall atau gagal
+    memuat file BPE (diunduh saat pertama dipakai - gagal kalau offline).
+    Hasil (termasuk kegagalan) di-cache, jadi tidak dicoba ulang per prompt
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"⚠️ tiktoken encoding unavailable ({e}) - using byte estimate")
+        return None
+
+def get_exact_token_count(prompt: str, model: str = "gpt-4o") -> int:
+    """
+    Jumlah token persis via tiktoken (fallback ke estimasi kalau tiktoken tidak tersedia)
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return get_prompt_stats(prompt)["estimated_tokens"]
+    return len(encoding.encode(prompt))
+
+def truncate_to_token_budget(text: str, max_tokens: int, model: str = "gpt-4o") -> str:
+    """
+    Potong text ke max_tokens token (bukan jumlah karakter), supaya budget konteks
+    terpakai penuh untuk teks ASCII dan tidak overrun untuk teks non-ASCII.
+    Tanpa tiktoken: estimasi _BYTES_PER_TOKEN byte UTF-8 per token
+    """
+    encoded = text.encode("utf-8")
+    # Setiap token minimal 1 byte, jadi teks sependek ini pasti muat
+    if len(encoded) <= max_tokens:
+        return text
+    
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        encoded = encoding.decode_bytes(tokens[:max_tokens])
+    else:
+        encoded = encoded[:max_tokens * _BYTES_PER_TOKEN]
+    
+    # Token/byte terakhir bisa memotong karakter multi-byte; buang sisanya
+    return encoded.decode("utf-8", errors="ignore")
@@ -3,9 +3,12 @@
 Script to reprocess existing result files with new unified approach
 """
 
+import hashlib
 import json
 import os
+import re
 import sys
+from collections import defaultdict
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -14,11 +17,117 @@ sys.path.append(str(Path(__file__).parent))
 from api_providers import initialize_providers, call_api
 from prompts import get_unified_analysis_prompt
 
-def reprocess_result_file(file_path: Path):
-    """Reprocess a single result file with unified approach"""
+# Optional orjson import (faster result file read/write)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional pyahocorasick import (single-pass multi-keyword scan; see requirements.tools.txt)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Keywords checked by analyze_and_improve_data (substring match on lowercased text)
+CONTENT_KEYWORDS = (
+    "read", "book", "recharge", "battery", "meditation", "mindfulness", "balance",
+    "work", "life", "sleep", "rest", "exercise", "physical", "mental health",
+    "stress", "burnout", "digital", "overwhelm", "children", "present", "conversation",
+)
+
+if AHOCORASICK_AVAILABLE:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in CONTENT_KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+# Content rules: (conditions, message). A rule fires when any condition set is fully
+# contained in the matched keywords, i.e. conditions are OR-ed sets of AND-ed keywords.
+ACTION_RULES = (
+    ((frozenset({"read", "book"}), frozenset({"read", "recharge"})),
+     "Read David's book 'Recharge' for mental wellness strategies"),
+    ((frozenset({"meditation"}), frozenset({"mindfulness"})),
+     "Practice meditation and mindfulness for stress management"),
+    ((frozenset({"balance", "work"}), frozenset({"balance", "life"})),
+     "Focus on achieving better work-life balance"),
+    ((frozenset({"sleep"}), frozenset({"rest"})),
+     "Prioritize quality sleep and rest for mental recharge"),
+    ((frozenset({"exercise"}), frozenset({"physical"})),
+     "Incorporate physical exercise into daily routine"),
+    ((frozenset({"mental health"}),),
+     "Regular mental health check-ins and self-awareness practices"),
+)
+
+INSIGHT_RULES = (
+    ((frozenset({"stress", "burnout"}),),
+     "61% of people are expected to 'just get over' stress - acknowledge and address it properly"),
+    ((frozenset({"recharge"}), frozenset({"battery"})),
+     "Mental health can be viewed like a phone battery - monitor and recharge regularly"),
+    ((frozenset({"digital"}), frozenset({"overwhelm"})),
+     "Digital overwhelm requires intentional strategies to manage information intake"),
+    ((frozenset({"children", "mental health"}),),
+     "Mental health education should start early - children need vocabulary and tools"),
+    ((frozenset({"present", "conversation"}),),
+     "Being present in conversations charges both people - it's not energy depleting"),
+)
+
+SPEAKER_RULES = (
+    ((frozenset({"stress"}), frozenset({"burnout"})),
+     "Discussed stress management and burnout prevention strategies"),
+    ((frozenset({"book"}), frozenset({"recharge"})),
+     "Shared insights about mental wellness and recharge practices"),
+    ((frozenset({"mental health"}),),
+     "Emphasized importance of mental health awareness and education"),
+    ((frozenset({"balance"}),),
+     "Highlighted the need for work-life balance and self-care"),
+    ((frozenset({"conversation"}), frozenset({"present"})),
+     "Demonstrated the power of authentic, present conversations"),
+)
+
+def apply_rules(rules, hits: set) -> list:
+    """Messages of all rules whose conditions are satisfied by hits, in rule order"""
+    return [message for conditions, message in rules
+            if any(condition <= hits for condition in conditions)]
+
+# "Speaker: text" lines; speaker labels longer than 40 chars are prose containing a colon
+SPEAKER_LINE_RE = re.compile(r'^([^:\n]{1,40}):[ \t]*(\S.*)$', re.MULTILINE)
+
+def find_keywords(lower_text: str) -> set:
+    """Return the CONTENT_KEYWORDS that occur in lower_text (one automaton pass when available)"""
+    if AHOCORASICK_AVAILABLE:
+        return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(lower_text)}
+    return {keyword for keyword in CONTENT_KEYWORDS if keyword in lower_text}
+
+def load_result_file(file_path: Path):
+    """Read a result JSON file"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(file_path.read_bytes())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_result_file(file_path: Path, data):
+    """Write a result JSON file (2-space indent, non-ASCII kept as-is)"""
+    if ORJSON_AVAILABLE:
+        file_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def reprocess_result_file(file_path: Path, state: dict = None):
+    """
+    Reprocess a single result file with unified approach.
+    state (optional manifest, updated in place): skip files whose mtime or transcript hash is unchanged
+    """
+    entry = state.get(file_path.name) if state is not None else None
+    if entry and entry.get("mtime_ns") == file_path.stat().st_mtime_ns:
+        print(f"⏭️ Skipped {file_path.name} (unchanged)")
+        return
+    
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_result_file(file_path)
         
         transcript = data.get('transcript', [])
         if not transcript:
@@ -26,19 +135,22 @@ def reprocess_result_file(file_path: Path):
             return
         
         # Format transcript for unified analysis
-        transcript_lines = []
-        for segment in transcript:
-            speaker = segment.get("speaker_name", "Speaker 1")
-            text = segment.get("text", "").strip()
-            if text:
-                transcript_lines.append(f"{speaker}: {text}")
-        
-        formatted_transcript = "\n".join(transcript_lines)
+        formatted_transcript = "\n".join(
+            f'{segment.get("speaker_name", "Speaker 1")}: {text}'
+            for segment in transcript
+            if (text := segment.get("text", "").strip())
+        )
         
         if not formatted_transcript.strip():
             print(f"⏭️ Skipped {file_path.name} (empty transcript)")
             return
         
+        transcript_hash = hashlib.blake2b(formatted_transcript.encode("utf-8"), digest_size=16).hexdigest()
+        if entry and entry.get("transcript_hash") == transcript_hash:
+            entry["mtime_ns"] = file_path.stat().st_mtime_ns
+            print(f"⏭️ Skipped {file_path.name} (transcript unchanged)")
+            return
+        
         # Initialize API providers (simplified)
         try:
             print(f"🔄 Reprocessing {file_path.name}...")
@@ -57,8 +169,13 @@ def reprocess_result_file(file_path: Path):
             data.update(improved_data)
             
             # Save back to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            save_result_file(file_path, data)
+            
+            if state is not None:
+                state[file_path.name] = {
+                    "mtime_ns": file_path.stat().st_mtime_ns,
+                    "transcript_hash": transcript_hash
+                }
             
             print(f"✅ Updated {file_path.name}")
             print(f"   - New action items: {len(improved_data.get('action_items', []))} items")
@@ -74,80 +191,25 @@ def reprocess_result_file(file_path: Path):
 def analyze_and_improve_data(data, transcript_text):
     """Analyze transcript and improve data extraction for podcast/interview content"""
     
-    # Extract better action items from podcast content
-    action_items = []
-    key_insights = []  # Rename from key_decisions since it's interview/podcast
-    speaker_points = []
-    
     # Analyze content for actionable insights
-    lower_transcript = transcript_text.lower()
-    
-    # Common podcast action patterns
-    if "read" in lower_transcript and ("book" in lower_transcript or "recharge" in lower_transcript):
-        action_items.append("Read David's book 'Recharge' for mental wellness strategies")
+    hits = find_keywords(transcript_text.lower())
     
-    if "meditation" in lower_transcript or "mindfulness" in lower_transcript:
-        action_items.append("Practice meditation and mindfulness for stress management")
-    
-    if "balance" in lower_transcript and ("work" in lower_transcript or "life" in lower_transcript):
-        action_items.append("Focus on achieving better work-life balance")
-    
-    if "sleep" in lower_transcript or "rest" in lower_transcript:
-        action_items.append("Prioritize quality sleep and rest for mental recharge")
-    
-    if "exercise" in lower_transcript or "physical" in lower_transcript:
-        action_items.append("Incorporate physical exercise into daily routine")
-    
-    if "mental health" in lower_transcript:
-        action_items.append("Regular mental health check-ins and self-awareness practices")
+    # Extract better action items from podcast content
+    action_items = apply_rules(ACTION_RULES, hits)
     
     # Extract key insights instead of decisions (better for interviews/podcasts)
-    if "stress" in lower_transcript and "burnout" in lower_transcript:
-        key_insights.append("61% of people are expected to 'just get over' stress - acknowledge and address it properly")
-    
-    if "recharge" in lower_transcript or "battery" in lower_transcript:
-        key_insights.append("Mental health can be viewed like a phone battery - monitor and recharge regularly")
-    
-    if "digital" in lower_transcript or "overwhelm" in lower_transcript:
-        key_insights.append("Digital overwhelm requires intentional strategies to manage information intake")
-    
-    if "children" in lower_transcript and "mental health" in lower_transcript:
-        key_insights.append("Mental health education should start early - children need vocabulary and tools")
-    
-    if "present" in lower_transcript and "conversation" in lower_transcript:
-        key_insights.append("Being present in conversations charges both people - it's not energy depleting")
+    key_insights = apply_rules(INSIGHT_RULES, hits)
     
     # Extract speaker-specific insights
-    transcript_by_speaker = {}
-    for line in transcript_text.split('\n'):
-        if ':' in line:
-            speaker_part = line.split(':', 1)
-            if len(speaker_part) == 2:
-                speaker = speaker_part[0].strip()
-                text = speaker_part[1].strip()
-                if speaker not in transcript_by_speaker:
-                    transcript_by_speaker[speaker] = []
-                transcript_by_speaker[speaker].append(text)
+    transcript_by_speaker = defaultdict(list)
+    for match in SPEAKER_LINE_RE.finditer(transcript_text):
+        transcript_by_speaker[match.group(1).strip()].append(match.group(2).strip())
     
     # Create speaker points based on content analysis
+    speaker_points = []
     for speaker, texts in transcript_by_speaker.items():
-        combined_text = ' '.join(texts).lower()
-        points = []
-        
-        if "stress" in combined_text or "burnout" in combined_text:
-            points.append("Discussed stress management and burnout prevention strategies")
-        
-        if "book" in combined_text or "recharge" in combined_text:
-            points.append("Shared insights about mental wellness and recharge practices")
-        
-        if "mental health" in combined_text:
-            points.append("Emphasized importance of mental health awareness and education")
-        
-        if "balance" in combined_text:
-            points.append("Highlighted the need for work-life balance and self-care")
-        
-        if "conversation" in combined_text or "present" in combined_text:
-            points.append("Demonstrated the power of authentic, present conversations")
+        speaker_hits = find_keywords(' '.join(texts).lower())
+        points = apply_rules(SPEAKER_RULES, speaker_hits)
         
         if points:
             speaker_points.append({
@@ -177,8 +239,28 @@ def analyze_and_improve_data(data, transcript_text):
         "clean_summary": data.get("clean_summary", data.get("summary", ""))
     }
 
+STATE_FILE_NAME = ".reprocess_state.json"
+
+def load_reprocess_state(results_dir: Path) -> dict:
+    """Load the reprocess manifest (file name -> mtime/transcript hash of last successful run)"""
+    state_path = results_dir / STATE_FILE_NAME
+    if not state_path.exists():
+        return {}
+    try:
+        return load_result_file(state_path)
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable reprocess state: {e}")
+        return {}
+
+def save_reprocess_state(results_dir: Path, state: dict):
+    """Atomically rewrite the reprocess manifest"""
+    state_path = results_dir / STATE_FILE_NAME
+    tmp_path = state_path.with_suffix(".tmp")
+    save_result_file(tmp_path, state)
+    os.replace(tmp_path, state_path)
+
 def main():
-    """Reprocess all result files with improved analysis"""
+    """Reprocess all result files with improved analysis (pass --force to ignore the manifest)"""
     results_dir = Path("results")
     
     if not results_dir.exists():
@@ -190,8 +272,12 @@ def main():
     print(f"🔍 Found {len(result_files)} result files")
     print("🧠 Using content-aware analysis for podcast/interview improvement...")
     
+    state = {} if "--force" in sys.argv else load_reprocess_state(results_dir)
+    
     for file_path in result_files:
-        reprocess_result_file(file_path)
+        reprocess_result_file(file_path, state)
+    
+    save_reprocess_state(results_dir, state)
     
     print(f"🎉 Reprocessing complete!")
 
@@ -0,0 +1,202 @@
+"""
+Semantic Response Cache
+=======================
+
+Cache jawaban LLM berdasarkan kemiripan semantik query (embedding) per context.
+Query yang mirip (cosine similarity >= threshold) terhadap transcript yang sama
+langsung mendapat jawaban dari cache, tanpa build prompt dan tanpa LLM call.
+
+Storage: SQLite (persisten antar restart), embedding: SentenceTransformers MiniLM.
+Entry kedaluwarsa setelah TTL dan jumlah row dibatasi (per context dan total).
+Hit hanya diterima kalau angka/nama di query sama persis dengan query yang di-cache
+("Speaker 1" vs "Speaker 2" mirip secara embedding tapi jawabannya beda).
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import numpy as np
+
+# Warning ditunda sampai cache benar-benar dipakai (cache opt-in via SEMANTIC_CACHE_ENABLED)
+try:
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+    _IMPORT_ERROR = None
+except ImportError as e:
+    SEMANTIC_CACHE_AVAILABLE = False
+    _IMPORT_ERROR = e
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_ROWS_PER_CONTEXT = 100
+DEFAULT_MAX_ROWS = 5000
+
+# Angka dan kata berhuruf kapital (nama, "Speaker", singkatan)
+_ENTITY_RE = re.compile(r"\b(?:\d+(?:[.,:]\d+)*|[A-Z][\w'-]*)")
+
+
+def context_hash(context: str) -> str:
+    """Hash pendek dan murah untuk slot context (transcript)"""
+    return hashlib.blake2b(context.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def query_entities(query: str) -> frozenset:
+    """Angka dan nama di query (case-insensitive); kata kapital di awal kalimat diabaikan"""
+    tokens = _ENTITY_RE.findall(query)
+    if tokens and not tokens[0][0].isdigit() and query.lstrip().startswith(tokens[0]):
+        tokens = tokens[1:]
+    return frozenset(token.lower() for token in tokens)
+
+
+class SemanticCache:
+    """SQLite-backed semantic cache keyed on (context hash, query embedding)"""
+
+    def __init__(self, db_path: str = "./results/semantic_cache.db",
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 encoder=None,
+                 ttl_hours: float = DEFAULT_TTL_HOURS,
+                 max_rows_per_context: int = DEFAULT_MAX_ROWS_PER_CONTEXT,
+                 max_rows: int = DEFAULT_MAX_ROWS):
+        """Initialize cache; reuse an already-loaded encoder when provided"""
+        self.db_path = db_path
+        self.threshold = threshold
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_rows_per_context = max_rows_per_context
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+
+        self.encoder = encoder
+        if self.encoder is None and not SEMANTIC_CACHE_AVAILABLE:
+            print(f"⚠️ Semantic cache dependencies not available: {_IMPORT_ERROR}")
+        elif self.encoder is None:
+            try:
+                self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+            except Exception as e:
+                print(f"⚠️ Failed to load semantic cache encoder: {e}")
+
+        self.available = self.encoder is not None
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS semantic_cache (
+                context_hash TEXT NOT NULL,
+                query TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                response TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_semantic_cache_ctx ON semantic_cache (context_hash)"
+        )
+        self._conn.commit()
+
+        if self.available:
+            print(f"✅ Semantic cache ready (threshold={threshold})")
+
+    def _embed(self, query: str) -> np.ndarray:
+        """Embed query sebagai vektor float32 ter-normalisasi (dot product = cosine)"""
+        vector = self.encoder.encode([query], convert_to_numpy=True, show_progress_bar=False)[0]
+        vector = vector.astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, query: str, ctx_hash: str, embedding: Optional[np.ndarray] = None) -> Optional[str]:
+        """Cari jawaban cache untuk query yang mirip pada context yang sama"""
+        if not self.available:
+            return None
+
+        if embedding is None:
+            embedding = self._embed(query)
+
+        # Hanya entry yang belum kedaluwarsa, terbaru dulu, maks max_rows_per_context
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT embedding, query, response FROM semantic_cache "
+                "WHERE context_hash = ? AND created_at >= ? ORDER BY rowid DESC LIMIT ?",
+                (ctx_hash, self._cutoff(), self.max_rows_per_context)
+            ).fetchall()
+
+        if not rows:
+            return None
+
+        matrix = np.vstack([np.frombuffer(blob, dtype=np.float32) for blob, _, _ in rows])
+        scores = matrix @ embedding
+
+        entities = query_entities(query)
+        for index in np.argsort(-scores):
+            if scores[index] < self.threshold:
+                break
+            _, cached_query, response = rows[index]
+            if query_entities(cached_query) == entities:
+                return response
+        return None
+
+    def _cutoff(self) -> str:
+        """created_at minimum untuk entry yang masih berlaku (ISO string, bisa dibandingkan leksikal)"""
+        return (datetime.now() - self.ttl).isoformat()
+
+    def _evict(self, ctx_hash: str):
+        """Hapus entry kedaluwarsa dan row terlama di atas batas per context / total (dipanggil dengan lock)"""
+        self._conn.execute("DELETE FROM semantic_cache WHERE created_at < ?", (self._cutoff(),))
+        self._conn.execute(
+            "DELETE FROM semantic_cache WHERE context_hash = ? AND rowid NOT IN "
+            "(SELECT rowid FROM semantic_cache WHERE context_hash = ? ORDER BY rowid DESC LIMIT ?)",
+            (ctx_hash, ctx_hash, self.max_rows_per_context)
+        )
+        self._conn.execute(
+            "DELETE FROM semantic_cache WHERE rowid NOT IN "
+            "(SELECT rowid FROM semantic_cache ORDER BY rowid DESC LIMIT ?)",
+            (self.max_rows,)
+        )
+
+    def store(self, query: str, ctx_hash: str, response: str, embedding: Optional[np.ndarray] = None):
+        """Simpan jawaban LLM untuk query + context"""
+        if not self.available:
+            return
+
+        if embedding is None:
+            embedding = self._embed(query)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO semantic_cache (context_hash, query, embedding, response, created_at) VALUES (?, ?, ?, ?, ?)",
+                (ctx_hash, query, embedding.tobytes(), response, datetime.now().isoformat())
+            )
+            self._evict(ctx_hash)
+            self._conn.commit()
+
+    def get_or_compute(self, query: str, context: str, compute: Callable[[], str]) -> str:
+        """
+        Return cached response for a semantically similar query, otherwise
+        call compute() (prompt build + LLM call) and cache its result.
+        """
+        if not self.available:
+            return compute()
+
+        ctx_hash = context_hash(context)
+        embedding = self._embed(query)
+
+        cached = self.lookup(query, ctx_hash, embedding)
+        if cached is not None:
+            print("⚡ Semantic cache hit")
+            return cached
+
+        response = compute()
+        self.store(query, ctx_hash, response, embedding)
+        return response
+
+    def clear(self, ctx_hash: Optional[str] = None):
+        """Hapus cache (semua, atau hanya untuk satu context)"""
+        with self._lock:
+            if ctx_hash is None:
+                self._conn.execute("DELETE FROM semantic_cache")
+            else:
+                self._conn.execute("DELETE FROM semantic_cache WHERE context_hash = ?", (ctx_hash,))
+            self._conn.commit()
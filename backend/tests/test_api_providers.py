@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from api_providers import _rejects_response_format, _send_with_format
+
+
+class ProviderError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def test_rejects_response_format_only_for_format_errors():
+    assert _rejects_response_format(ProviderError("400: response_format json_schema not supported", 400))
+    assert _rejects_response_format(TypeError("chat() got an unexpected keyword argument 'response_format'"))
+    assert not _rejects_response_format(ProviderError("401: invalid api key", 401))
+    assert not _rejects_response_format(ProviderError("Connection error", None))
+    assert not _rejects_response_format(ProviderError("400: max_tokens too large", 400))
+
+
+def test_send_with_format_retries_same_provider_once():
+    calls = []
+
+    def send(**kw):
+        calls.append(kw)
+        if kw:
+            raise ProviderError("422: response_format is not supported by this model", 422)
+        return "ok"
+
+    assert _send_with_format(send, {"response_format": {"type": "json_object"}}, "Test") == "ok"
+    assert calls == [{"response_format": {"type": "json_object"}}, {}]
+
+
+def test_send_with_format_does_not_retry_other_errors():
+    def send(**kw):
+        raise ProviderError("503: service unavailable", 503)
+
+    with pytest.raises(ProviderError):
+        _send_with_format(send, {"response_format": {"type": "json_object"}}, "Test")
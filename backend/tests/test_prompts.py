@@ -0,0 +1,119 @@
+import pytest
+
+import prompts
+from prompts import (
+    _TRUNC_MARKER,
+    EXTRACTION_TRANSCRIPT_LIMIT,
+    SUMMARY_TRANSCRIPT_LIMIT,
+    UNIFIED_PROMPT_LIMIT,
+    UNIFIED_TRANSCRIPT_TOKENS,
+    UNIFIED_TRANSCRIPT_LIMIT,
+    get_comprehensive_summary_prompt,
+    get_exact_token_count,
+    get_sectioned_analysis_prompts,
+    get_structured_data_extraction_prompt,
+    get_structured_data_extraction_request,
+    get_summary_prompt,
+    get_unified_analysis_prompt,
+    trim_to_turn,
+    truncate_transcript,
+    would_exceed,
+)
+
+
+def test_truncate_transcript_exact_limit():
+    # No newline/sentence boundary to snap to: the result fills the limit exactly
+    result = truncate_transcript("x" * 10000, 6000)
+    assert len(result) == 6000
+    assert _TRUNC_MARKER in result
+
+    # With boundaries the cuts snap inward, never past the limit
+    text = "".join(f"Speaker {i % 3}: Sentence number {i}. Another one!\n" for i in range(500))
+    assert len(truncate_transcript(text, 6000)) <= 6000
+
+    assert truncate_transcript("short", 6000) == "short"
+
+
+def test_truncate_transcript_small_limit():
+    assert truncate_transcript("x" * 100, 10) == "x" * 10
+    assert truncate_transcript("x" * 100, len(_TRUNC_MARKER)) == "x" * len(_TRUNC_MARKER)
+    assert truncate_transcript("x" * 100, 0) == ""
+    for limit in range(len(_TRUNC_MARKER) + 5):
+        assert len(truncate_transcript("x" * 100, limit)) <= limit
+
+
+def test_transcript_builders_canonicalize_whitespace():
+    clean = "Speaker 1: Hello.\n\nSpeaker 2: Hi.\n"
+    noisy = "Speaker 1: Hello.  \n\n\n\nSpeaker 2: Hi.\t\n"
+    builders = [
+        get_summary_prompt,
+        get_comprehensive_summary_prompt,
+        get_unified_analysis_prompt,
+        get_structured_data_extraction_prompt,
+        lambda t: get_sectioned_analysis_prompts(t, ["Speaker 1", "Speaker 2"]),
+    ]
+    for build in builders:
+        assert build(noisy) == build(clean)
+
+
+def test_would_exceed_matches_unified_prompt_length():
+    fits = "x" * UNIFIED_TRANSCRIPT_LIMIT
+    assert not would_exceed(fits)
+    assert len(get_unified_analysis_prompt(fits)) == UNIFIED_PROMPT_LIMIT
+
+    assert would_exceed(fits + "x")
+    assert not would_exceed(truncate_transcript(fits + "x", UNIFIED_TRANSCRIPT_LIMIT))
+
+
+def test_unified_head_respects_token_budget():
+    pytest.importorskip("tiktoken")
+    cjk = "发言人：我们下周三之前完成预算审查。\n" * 500
+    prompt = get_unified_analysis_prompt(cjk)
+    head = prompt[prompt.rindex("TRANSCRIPT:\n") + len("TRANSCRIPT:\n"):]
+    assert 0 < get_exact_token_count(head) <= UNIFIED_TRANSCRIPT_TOKENS
+
+
+def test_trim_to_turn_keeps_prefix_at_turn_boundary():
+    text = "".join(f"Speaker {i % 2}: turn {i}\n" for i in range(100))
+    trimmed = trim_to_turn(text, 500)
+    assert len(trimmed) <= 500
+    assert text.startswith(trimmed)
+    assert trimmed.endswith("turn %d" % trimmed.count("\n"))
+    assert _TRUNC_MARKER not in trimmed
+
+    assert trim_to_turn("x" * 100, 10) == "x" * 10
+    assert trim_to_turn(text, len(text)) == text
+
+
+def test_offline_tiktoken_falls_back_to_byte_estimate(monkeypatch):
+    calls = []
+
+    class OfflineTiktoken:
+        @staticmethod
+        def encoding_for_model(model):
+            calls.append(model)
+            raise OSError("could not download cl100k_base.tiktoken")
+
+    monkeypatch.setattr(prompts, "tiktoken", OfflineTiktoken, raising=False)
+    monkeypatch.setattr(prompts, "TIKTOKEN_AVAILABLE", True)
+    prompts._get_encoding.cache_clear()
+    try:
+        cjk = "预算审查" * 2000
+        get_unified_analysis_prompt(cjk)
+        get_unified_analysis_prompt(cjk + "。")
+        assert get_exact_token_count("abcdefgh") == 2
+    finally:
+        prompts._get_encoding.cache_clear()
+
+    # The failed load is cached: one attempt, not one per prompt
+    assert calls == ["gpt-4o"]
+
+
+def test_full_transcript_builders_bound_their_input():
+    huge = "Speaker 1: a long meeting sentence.\n" * 100000
+    assert len(get_summary_prompt(huge)) <= len(get_summary_prompt("")) + SUMMARY_TRANSCRIPT_LIMIT
+    assert len(get_structured_data_extraction_prompt(huge)) <= (
+        len(get_structured_data_extraction_prompt("")) + EXTRACTION_TRANSCRIPT_LIMIT
+    )
+    prompt, _ = get_structured_data_extraction_request(huge)
+    assert len(prompt) <= len(get_structured_data_extraction_request("")[0]) + EXTRACTION_TRANSCRIPT_LIMIT
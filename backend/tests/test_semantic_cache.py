@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from semantic_cache import SemanticCache, context_hash
+
+
+class LetterCountEncoder:
+    """Stub encoder: letter histogram, so queries differing only in digits embed identically"""
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False):
+        vectors = np.zeros((len(texts), 26), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for char in text.lower():
+                if "a" <= char <= "z":
+                    vectors[row, ord(char) - ord("a")] += 1
+        return vectors
+
+
+def make_cache(tmp_path, **kwargs):
+    return SemanticCache(db_path=str(tmp_path / "cache.db"), encoder=LetterCountEncoder(), **kwargs)
+
+
+def row_count(cache, ctx=None):
+    if ctx is None:
+        return cache._conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0]
+    return cache._conn.execute(
+        "SELECT COUNT(*) FROM semantic_cache WHERE context_hash = ?", (ctx,)
+    ).fetchone()[0]
+
+
+def test_lookup_hits_similar_query_on_same_context(tmp_path):
+    cache = make_cache(tmp_path)
+    ctx = context_hash("Alice: hello")
+    cache.store("what did they decide", ctx, "They decided to ship.")
+
+    assert cache.lookup("What did they decide?", ctx) == "They decided to ship."
+    assert cache.lookup("what did they decide", context_hash("other transcript")) is None
+    assert cache.lookup("summarize the budget discussion", ctx) is None
+
+
+def test_entity_guard_rejects_different_numbers_and_names(tmp_path):
+    cache = make_cache(tmp_path)
+    ctx = context_hash("transcript")
+    cache.store("what did Speaker 1 say", ctx, "Speaker 1 answer")
+
+    # Same letters, so the stub embeddings are identical - only the entity guard separates them
+    assert cache.lookup("what did Speaker 2 say", ctx) is None
+    assert cache.lookup("what did Speaker 1 say", ctx) == "Speaker 1 answer"
+
+
+def test_ttl_expiry(tmp_path):
+    cache = make_cache(tmp_path, ttl_hours=1)
+    ctx = context_hash("transcript")
+    cache.store("what happened", ctx, "answer")
+    old = (datetime.now() - timedelta(hours=2)).isoformat()
+    cache._conn.execute("UPDATE semantic_cache SET created_at = ?", (old,))
+
+    assert cache.lookup("what happened", ctx) is None
+
+    # Expired rows are deleted on the next store
+    cache.store("something else", ctx, "other")
+    assert row_count(cache) == 1
+
+
+def test_row_caps_evict_oldest(tmp_path):
+    cache = make_cache(tmp_path, max_rows_per_context=3, max_rows=4)
+    first, second = context_hash("first"), context_hash("second")
+    queries = ["alpha", "bravo", "charlie", "delta", "echo"]
+    for query in queries:
+        cache.store(query, first, query.upper())
+
+    assert row_count(cache, first) == 3
+    assert cache.lookup("alpha", first) is None
+    assert cache.lookup("echo", first) == "ECHO"
+
+    cache.store("foxtrot", second, "FOXTROT")
+    cache.store("golf", second, "GOLF")
+    assert row_count(cache) == 4
+    assert cache.lookup("charlie", first) is None
+    assert cache.lookup("golf", second) == "GOLF"
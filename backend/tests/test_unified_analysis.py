@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from prompts import get_sectioned_analysis_prompts
+from unified_analysis import (
+    REQUIRED_FIELDS,
+    generate_sectioned_analysis,
+    parse_unified_response,
+    validate_unified_result,
+)
+
+TRANSCRIPT = "Alice: We ship on Friday.\nBob: I will update the docs."
+SPEAKERS = ["Alice", "Bob"]
+
+SECTIONS = {
+    "narrative_summary": 'Alice and Bob agreed the plan: "ship on Friday".',
+    "speaker_points": [
+        {"speaker": "Alice", "points": ["Release date: Friday"]},
+        {"speaker": "Bob", "points": ["Owns the docs update"]},
+    ],
+    "key_decisions": [{"title": "Ship on Friday", "description": "Release date: Friday"}],
+    "enhanced_action_items": [{"title": "Update docs", "assigned_to": "Bob", "priority": "High"}],
+}
+
+
+def test_sectioned_analysis_end_to_end():
+    by_prompt = {
+        prompt: f"```json\n{json.dumps({field: SECTIONS[field]}, indent=2)}\n```"
+        for field, prompt in get_sectioned_analysis_prompts(TRANSCRIPT, SPEAKERS).items()
+    }
+    segments = [{"speaker_name": "Alice", "text": "We ship on Friday."}]
+
+    sections = asyncio.run(generate_sectioned_analysis(TRANSCRIPT, SPEAKERS, by_prompt.__getitem__))
+    result = validate_unified_result(sections, segments)
+
+    assert result == SECTIONS
+
+
+def test_sectioned_analysis_failed_section_gets_fallback():
+    failing = get_sectioned_analysis_prompts(TRANSCRIPT, SPEAKERS)["speaker_points"]
+
+    def call(prompt):
+        if prompt == failing:
+            raise RuntimeError("provider down")
+        return "not json"
+
+    segments = [{"speaker_name": "Alice", "text": "Hi."}]
+    sections = asyncio.run(generate_sectioned_analysis(TRANSCRIPT, SPEAKERS, call))
+    assert sections == {}
+
+    result = validate_unified_result(sections, segments)
+    assert all(result[field] for field in REQUIRED_FIELDS)
+
+
+def test_parse_unified_response_pretty_printed():
+    response = "Here is the analysis:\n" + json.dumps(SECTIONS, indent=2)
+    assert parse_unified_response(response) == SECTIONS
@@ -169,6 +169,41 @@ def get_optimal_device_config():
             "gpu_memory": "N/A"
         }
 
+def get_cpu_threads() -> int:
+    """
+    CPU threads for Faster-Whisper (CTranslate2 defaults to 4 when cpu_threads=0).
+    Override with WHISPER_CPU_THREADS; defaults to all available cores.
+    """
+    threads = os.getenv("WHISPER_CPU_THREADS")
+    if threads:
+        return int(threads)
+    return os.cpu_count() or 4
+
+# Approximate int8 CPU RAM per model (MB), used to budget the loaded-model cache
+MODEL_MEMORY_MB = {
+    "tiny": 512,
+    "base": 1000,
+    "small": 1500,
+    "medium": 2000,
+    "large-v1": 3000,
+    "large-v2": 3000,
+    "large-v3": 3000,
+}
+
+def get_max_segments() -> int:
+    """
+    Optional cap on transcribed segments (WHISPER_MAX_SEGMENTS).
+    0 / unset = unlimited, so long recordings are never silently truncated.
+    """
+    return int(os.getenv("WHISPER_MAX_SEGMENTS", "0"))
+
+def get_model_cache_budget_mb() -> int:
+    """
+    RAM budget for loaded Faster-Whisper models (default fits large-v3 + small).
+    Override with WHISPER_MODEL_CACHE_MB; least recently used models are evicted.
+    """
+    return int(os.getenv("WHISPER_MODEL_CACHE_MB", "4500"))
+
 def get_whisper_config(mode: str = None):
     """Get Whisper configuration for specified mode"""
     if mode is None:
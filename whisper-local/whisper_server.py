@@ -2,6 +2,7 @@ import os
 import asyncio
 import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 from pathlib import Path
 
@@ -18,6 +19,41 @@ app = FastAPI(title="Local Whisper API", version="1.0.0")
 # Global variables for model
 whisper_model = None
 DEFAULT_MODEL = "tiny"  # Use tiny model for faster loading and lower memory usage
+UPLOAD_CHUNK_SIZE = 1 << 20  # Stream uploads in 1MB chunks
+MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB limit
+
+# Single worker: the model is not thread-safe, extra requests queue here
+# while the event loop keeps serving uploads and health checks
+_executor = ThreadPoolExecutor(max_workers=1)
+
+async def run_transcribe(audio_path: str, **options):
+    """Run blocking whisper_model.transcribe in the inference thread"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, lambda: whisper_model.transcribe(audio_path, **options)
+    )
+
+async def save_upload_to_temp(file: UploadFile, max_size: int = None):
+    """Stream upload to a temporary file in chunks; returns (path, size in bytes)"""
+    fd, temp_file_path = tempfile.mkstemp(suffix=Path(file.filename).suffix)
+    os.close(fd)
+    
+    file_size = 0
+    try:
+        async with aiofiles.open(temp_file_path, "wb") as temp_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if max_size is not None and file_size > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large (>{max_size/1024/1024:.0f}MB). Maximum size is {max_size/1024/1024}MB."
+                    )
+                await temp_file.write(chunk)
+    except Exception:
+        os.unlink(temp_file_path)
+        raise
+    
+    return temp_file_path, file_size
 
 def load_whisper_model(model_size: str = "base"):
     """Load Whisper model"""
@@ -30,8 +66,23 @@ def load_whisper_model(model_size: str = "base"):
         device = "cuda" if torch.cuda.is_available() else "cpu"
         print(f"🔧 Using device: {device}")
         
-        # Load model
-        whisper_model = whisper.load_model(model_size, device=device)
+        # Optional dynamic int8 quantization of Linear layers (CPU only)
+        quantize = device == "cpu" and os.getenv("WHISPER_QUANTIZE", "false").lower() == "true"
+        if quantize:
+            # whisper.model.Linear subclasses nn.Linear, which quantize_dynamic does not match;
+            # build this model with plain nn.Linear and restore the class right after loading
+            import whisper.model as whisper_model_module
+            original_linear = whisper_model_module.Linear
+            whisper_model_module.Linear = torch.nn.Linear
+            try:
+                whisper_model = whisper.load_model(model_size, device=device)
+            finally:
+                whisper_model_module.Linear = original_linear
+            whisper_model = torch.quantization.quantize_dynamic(whisper_model, {torch.nn.Linear}, dtype=torch.qint8)
+            print("⚡ Applied dynamic int8 quantization to Linear layers")
+        else:
+            # Load model
+            whisper_model = whisper.load_model(model_size, device=device)
         model_name = model_size
         
         print(f"✅ Whisper model '{model_size}' loaded successfully on {device}")
@@ -97,23 +148,10 @@ async def create_transcription(
         print(f"🎵 Transcribing file: {file.filename}")
         print(f"📋 Request params: model={model}, format={response_format}, granularities={timestamp_granularities}")
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-            # Save uploaded file
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Stream upload to temporary file (size limit enforced while writing)
+        temp_file_path, file_size = await save_upload_to_temp(file, MAX_FILE_SIZE)
         
         try:
-            # Check file size before processing
-            file_size = len(content)
-            max_size = 25 * 1024 * 1024  # 25MB limit
-            if file_size > max_size:
-                raise HTTPException(
-                    status_code=413, 
-                    detail=f"File too large ({file_size/1024/1024:.1f}MB). Maximum size is {max_size/1024/1024}MB."
-                )
-            
             # Transcribe with Whisper
             print(f"🤖 Running Whisper transcription...")
             print(f"📊 File size: {file_size/1024/1024:.1f}MB")
@@ -121,7 +159,7 @@ async def create_transcription(
             
             # Add timeout and memory management
             try:
-                result = whisper_model.transcribe(
+                result = await run_transcribe(
                     temp_file_path,
                     word_timestamps=True,
                     verbose=False,
@@ -161,7 +199,7 @@ async def create_transcription(
                 response = {
                     "task": "transcribe",
                     "language": result.get("language", "en"),
-                    "duration": len(content) / 16000.0,  # Rough estimate
+                    "duration": file_size / 16000.0,  # Rough estimate
                     "text": result.get("text", ""),
                     "segments": segments
                 }
@@ -218,19 +256,17 @@ async def create_translation(
         
         print(f"🌍 Translating file: {file.filename}")
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Stream upload to temporary file
+        temp_file_path, file_size = await save_upload_to_temp(file)
         
         try:
             # Translate with Whisper
-            result = whisper_model.transcribe(
+            result = await run_transcribe(
                 temp_file_path,
                 task="translate",  # This translates to English
                 word_timestamps=True,
-                verbose=False
+                verbose=False,
+                fp16=False  # Disable FP16 for stability on CPU
             )
             
             if response_format == "verbose_json":
@@ -253,7 +289,7 @@ async def create_translation(
                 response = {
                     "task": "translate",
                     "language": result.get("language", "en"),
-                    "duration": len(content) / 16000.0,
+                    "duration": file_size / 16000.0,
                     "text": result.get("text", ""),
                     "segments": segments
                 }